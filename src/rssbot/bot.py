@@ -1,19 +1,24 @@
 from __future__ import annotations
 import asyncio
+import codecs
 import csv
 import hashlib
 from html import escape as html_escape
 import json
 import logging
 import re
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import Awaitable, Callable, Optional
 from urllib.parse import parse_qs, urlparse
 from zoneinfo import ZoneInfo
 
+import aiohttp
 from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.types import (
@@ -24,6 +29,14 @@ from aiogram.types import (
     InlineKeyboardMarkup,
     Message,
 )
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import joinedload
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional speedup
+    orjson = None
 
 from .config import Settings
 from .db import Delivery, Feed, FeedBaseline, FeedRule, Item, Session, User, session_scope
@@ -52,7 +65,15 @@ from .youtube_transcribe import (
     transcript_options_from_settings,
     transcribe_video_with_whisper,
 )
-from utils.yt_channel_id import get_channel_id
+from utils.yt_channel_id import (
+    USER_AGENT,
+    ChannelHeadParser,
+    build_ssl_context,
+    extract_from_html,
+    extract_from_json_anchors,
+    extract_from_path,
+    normalize_url,
+)
 
 
 router = Router()
@@ -81,22 +102,38 @@ def _normalize_ics_url(url: str) -> str:
 
 def _is_allowed(chat_id: int) -> bool:
     assert DEPS is not None
-    allowed = DEPS.settings.allowed_chat_ids()
-    return True if not allowed else chat_id in allowed
+    allowed = DEPS.settings.allowed_chat_id_set
+    return True if allowed is None else chat_id in allowed
+
+
+USER_ID_CACHE_MAX = 4096
+# chat_id -> users.id; users are never deleted, so entries only need a size bound
+_USER_ID_CACHE: "OrderedDict[int, int]" = OrderedDict()
+
+
+def _get_or_create_user_id(chat_id: int) -> int:
+    user_id = _USER_ID_CACHE.get(chat_id)
+    if user_id is not None:
+        _USER_ID_CACHE.move_to_end(chat_id)
+        return user_id
+    with session_scope() as s:
+        user_id = s.scalar(select(User.id).where(User.chat_id == chat_id))
+        if user_id is None:
+            # Auto-register on first interaction
+            user = User(chat_id=chat_id, tz=DEPS.settings.TZ)
+            s.add(user)
+            s.flush()
+            user_id = user.id
+    _USER_ID_CACHE[chat_id] = user_id
+    if len(_USER_ID_CACHE) > USER_ID_CACHE_MAX:
+        _USER_ID_CACHE.popitem(last=False)
+    return user_id
 
 
 def _ensure_user_id(message: Message) -> Optional[int]:
     if not _is_allowed(message.chat.id):
         return None
-    with session_scope() as s:
-        user = s.query(User).filter(User.chat_id == message.chat.id).first()
-        if user:
-            return user.id
-        # Auto-register on first interaction
-        user = User(chat_id=message.chat.id, tz=DEPS.settings.TZ)
-        s.add(user)
-        s.flush()
-        return user.id
+    return _get_or_create_user_id(message.chat.id)
 
 
 @router.message(Command("start"))
@@ -104,13 +141,9 @@ async def cmd_start(message: Message) -> None:
     if not _is_allowed(message.chat.id):
         await message.answer("Доступ запрещен.")
         return
-    with session_scope() as s:
-        user = s.query(User).filter(User.chat_id == message.chat.id).first()
-        if not user:
-            user = User(chat_id=message.chat.id, tz=DEPS.settings.TZ)
-            s.add(user)
-            s.flush()
-    web_link = f"http://{DEPS.settings.WEB_HOST}:{DEPS.settings.WEB_PORT}/u/{message.chat.id}"
+    settings = DEPS.settings
+    _get_or_create_user_id(message.chat.id)
+    web_link = f"http://{settings.WEB_HOST}:{settings.WEB_PORT}/u/{message.chat.id}"
     await message.answer(
         "Привет! Я <b>UnsubscribeMe</b>.\n"
         "Помогаю следить за YouTube/RSS и событиями с фильтрацией и AI.\n\n"
@@ -137,6 +170,8 @@ async def _create_feed_and_seed_reply(
     interval: int,
     digest_time: Optional[str],
 ) -> None:
+    settings = DEPS.settings
+    scheduler = DEPS.scheduler
     # Remove duplicates (same URL) for this user before adding/reusing
     removed = _dedupe_user_feeds(user_id)
 
@@ -156,7 +191,7 @@ async def _create_feed_and_seed_reply(
                 if digest_time:
                     existing.digest_time_local = digest_time
                 elif not existing.digest_time_local:
-                    existing.digest_time_local = DEPS.settings.DIGEST_DEFAULT_TIME
+                    existing.digest_time_local = settings.DIGEST_DEFAULT_TIME
             else:
                 existing.digest_time_local = None
             s.flush()
@@ -165,7 +200,7 @@ async def _create_feed_and_seed_reply(
         else:
             digest_time_local = None
             if mode == "digest":
-                digest_time_local = digest_time or DEPS.settings.DIGEST_DEFAULT_TIME
+                digest_time_local = digest_time or settings.DIGEST_DEFAULT_TIME
             feed = Feed(
                 user_id=user_id,
                 url=url,
@@ -181,27 +216,35 @@ async def _create_feed_and_seed_reply(
             feed_id = feed.id
             already_exists = False
 
-    DEPS.scheduler.schedule_feed_poll(feed_id, interval)
+    scheduler.schedule_feed_poll(feed_id, interval)
 
     notify = ""
     try:
         latest_item_id = await fetch_and_store_latest_item(feed_id)
         # Set baseline on first setup if absent
+        # Existence probe and item lookup read only the needed columns, no ORM rows
         with session_scope() as s:
-            if s.get(FeedBaseline, feed_id) is None:
+            has_baseline = (
+                s.scalar(select(1).where(FeedBaseline.feed_id == feed_id).limit(1)) is not None
+            )
+            if not has_baseline:
                 if latest_item_id:
-                    it = s.get(Item, latest_item_id)
+                    external_id, published_at = s.execute(
+                        select(Item.external_id, Item.published_at).where(
+                            Item.id == latest_item_id
+                        )
+                    ).one()
                     s.add(
                         FeedBaseline(
                             feed_id=feed_id,
-                            baseline_item_external_id=it.external_id,
-                            baseline_published_at=it.published_at,
+                            baseline_item_external_id=external_id,
+                            baseline_published_at=published_at,
                         )
                     )
                 else:
                     s.add(FeedBaseline(feed_id=feed_id))
         if latest_item_id:
-            delivered, reason = await DEPS.scheduler._send_item_once_ignore_mode(latest_item_id)
+            delivered, reason = await scheduler._send_item_once_ignore_mode(latest_item_id)
             if delivered:
                 notify = " Последняя запись отправлена."
             else:
@@ -227,6 +270,7 @@ async def _create_event_source_feed_reply(
     interval: int,
     source_type: str = "event_json",
 ) -> None:
+    scheduler = DEPS.scheduler
     normalized_type = source_type.strip().lower()
     if normalized_type not in {"event_json", "event_ics"}:
         normalized_type = "event_json"
@@ -264,7 +308,7 @@ async def _create_event_source_feed_reply(
             feed_id = feed.id
             already_exists = False
 
-    DEPS.scheduler.schedule_feed_poll(feed_id, interval)
+    scheduler.schedule_feed_poll(feed_id, interval)
 
     loaded = 0
     delivered = 0
@@ -272,7 +316,7 @@ async def _create_event_source_feed_reply(
     try:
         created_ids = await fetch_and_store_event_source(feed_id)
         loaded = len(created_ids)
-        delivered = await DEPS.scheduler._deliver_due_event_starts(feed_id)
+        delivered = await scheduler._deliver_due_event_starts(feed_id)
     except Exception as e:
         error = str(e)[:160]
 
@@ -370,7 +414,22 @@ def _dedupe_user_feeds(user_id: int) -> int:
     """
     removed_ids: list[int] = []
     with session_scope() as s:
-        feeds = s.query(Feed).filter(Feed.user_id == user_id).order_by(Feed.id.asc()).all()
+        # Cheap probe first: the common case has no duplicates and loads no Feed rows
+        dup_urls = s.scalars(
+            select(Feed.url)
+            .where(Feed.user_id == user_id)
+            .group_by(Feed.url)
+            .having(func.count(Feed.id) > 1)
+        ).all()
+        if not dup_urls:
+            return 0
+        feeds = s.scalars(
+            select(Feed)
+            # Rules are read for every duplicate below; fetch the 1:1 rows in the same SELECT
+            .options(joinedload(Feed.rules))
+            .where(Feed.user_id == user_id, Feed.url.in_(dup_urls))
+            .order_by(Feed.id.asc())
+        ).all()
         by_url: dict[str, list[Feed]] = {}
         for f in feeds:
             by_url.setdefault(f.url, []).append(f)
@@ -380,25 +439,33 @@ def _dedupe_user_feeds(user_id: int) -> int:
                 continue
             # Prefer an enabled feed; if multiple, prefer the newest id; else newest id overall
             keep = sorted(same, key=lambda x: (not x.enabled, -x.id))[0]
-            existing_ext = {
-                ext for (ext,) in s.query(Item.external_id).filter(Item.feed_id == keep.id).all()
-            }
+            # Evaluated per statement, so items moved from an earlier dup count as existing
+            kept_ext = select(Item.external_id).where(Item.feed_id == keep.id)
             for dup in same[1:]:
                 if dup.id == keep.id:
                     continue
-                # Move/dedup items
-                for it in s.query(Item).filter(Item.feed_id == dup.id).all():
-                    if it.external_id in existing_ext:
-                        s.query(Delivery).filter(Delivery.item_id == it.id).delete(
-                            synchronize_session=False
-                        )
-                        s.delete(it)
-                    else:
-                        it.feed_id = keep.id
-                        existing_ext.add(it.external_id)
+                # Move/dedup items set-based: drop the ones the kept feed already has
+                # (with their deliveries), then move the rest in one UPDATE.
+                clashing = select(Item.id).where(
+                    Item.feed_id == dup.id, Item.external_id.in_(kept_ext)
+                )
+                no_sync = {"synchronize_session": False}
+                s.execute(
+                    delete(Delivery).where(Delivery.item_id.in_(clashing)),
+                    execution_options=no_sync,
+                )
+                s.execute(
+                    delete(Item).where(Item.feed_id == dup.id, Item.external_id.in_(kept_ext)),
+                    execution_options=no_sync,
+                )
+                s.execute(
+                    update(Item).where(Item.feed_id == dup.id).values(feed_id=keep.id),
+                    execution_options=no_sync,
+                )
                 # Reassign deliveries to kept feed
-                s.query(Delivery).filter(Delivery.feed_id == dup.id).update(
-                    {Delivery.feed_id: keep.id}, synchronize_session=False
+                s.execute(
+                    update(Delivery).where(Delivery.feed_id == dup.id).values(feed_id=keep.id),
+                    execution_options=no_sync,
                 )
                 # Merge or drop rules
                 if keep.rules is None and dup.rules is not None:
@@ -409,16 +476,18 @@ def _dedupe_user_feeds(user_id: int) -> int:
                 s.delete(dup)
 
     # Unschedule removed duplicates
-    for fid in removed_ids:
-        try:
-            DEPS.scheduler.unschedule_feed_poll(fid)
-        except Exception:
-            pass
+    if removed_ids:
+        DEPS.scheduler.unschedule_feed_polls(removed_ids)
     return len(removed_ids)
 
 
+@lru_cache(maxsize=1024)
 def _resolve_feed_display_url(feed_url: str) -> Optional[str]:
     """Return a public page URL for a feed if it is a supported YouTube feed."""
+    # Pure function of the stored URL, so /list reuses earlier results; the substring
+    # check skips urlparse/parse_qs entirely for non-YouTube feeds.
+    if "youtube.com" not in (feed_url or "").lower():
+        return None
     parsed = urlparse((feed_url or "").strip())
     host = (parsed.netloc or "").lower()
     path = (parsed.path or "").lower()
@@ -482,7 +551,42 @@ TRANSCRIPT_MISSING_MARKERS = (
     "connect timeout",
     "timed out",
 )
-YOUTUBE_CHANNEL_ID_RE = re.compile(r"^UC[A-Za-z0-9_-]{22}$")
+FEED_MODES = frozenset({"immediate", "digest", "on_demand"})
+# FeedRule columns that /setfilter may set from user JSON
+FILTER_FIELDS = frozenset(
+    {
+        "include_keywords",
+        "exclude_keywords",
+        "include_regex",
+        "exclude_regex",
+        "require_all",
+        "case_sensitive",
+        "categories",
+        "min_duration_sec",
+        "max_duration_sec",
+    }
+)
+FILTER_BOOL_FIELDS = frozenset({"require_all", "case_sensitive"})
+YOUTUBE_PAGE_CHUNK_BYTES = 16 * 1024
+YOUTUBE_PAGE_MAX_BYTES = 200_000
+YOUTUBE_ANCHOR_OVERLAP_BYTES = 64
+CHANNEL_ID_CACHE_MAX = 1024
+CHANNEL_ID_CACHE_TTL_SEC = 24 * 3600
+YOUTUBE_CHANNEL_FEED_TMPL = "https://www.youtube.com/feeds/videos.xml?channel_id=%s"
+YOUTUBE_PLAYLIST_FEED_TMPL = "https://www.youtube.com/feeds/videos.xml?playlist_id=%s"
+YOUTUBE_CHANNEL_ID_RE = re.compile(r"UC[A-Za-z0-9_-]{22}")
+YOUTUBE_PLAYLIST_ID_RE = re.compile(r"(?:PL|UU|LL|FL|OL)[A-Za-z0-9_-]{10,}")
+# One pass over the supported channel URL formats: /channel/<id>, /@handle, /c/<name>, /user/<name>.
+YOUTUBE_CHANNEL_URL_RE = re.compile(
+    r"youtube\.com/(?:channel/(?P<channel_id>UC[A-Za-z0-9_-]{22})(?![A-Za-z0-9_-])"
+    r"|@(?P<handle>[^/?#&\s]+)|c/(?P<custom>[^/?#&\s]+)|user/(?P<user>[^/?#&\s]+))"
+)
+# Canonical channel page per YOUTUBE_CHANNEL_URL_RE group (match.lastgroup) that needs a fetch
+YOUTUBE_CHANNEL_PAGE_TMPL = {
+    "handle": "https://www.youtube.com/@%s",
+    "custom": "https://www.youtube.com/c/%s",
+    "user": "https://www.youtube.com/user/%s",
+}
 
 
 def _format_timestamp(seconds: float) -> str:
@@ -500,10 +604,49 @@ def _parse_command_single_arg(raw_text: str, *, command_name: str) -> str:
     return parts[1].strip().split(maxsplit=1)[0]
 
 
+@dataclass(frozen=True)
+class FeedOptions:
+    mode: str
+    label: Optional[str]
+    interval: int
+    digest_time: Optional[str]
+
+
+def _parse_feed_args(tokens: list[str], settings: Settings) -> FeedOptions:
+    """Parse `[mode] [mode=...] [label=...] [interval=N] [time=HH:MM]` feed options."""
+    mode = "immediate"
+    label = None
+    interval = settings.DEFAULT_POLL_INTERVAL_MIN
+    digest_time = None
+    for a in tokens:
+        key, sep, value = a.partition("=")
+        if not sep:
+            # Tokens come from str.split(), so they carry no surrounding whitespace
+            aval = a.lower()
+            if aval in FEED_MODES:
+                mode = aval
+        elif key == "mode":
+            mode = value
+        elif key == "label":
+            label = value
+        elif key == "interval":
+            try:
+                interval = int(value)
+            except Exception:
+                pass
+        elif key == "time":
+            digest_time = value or None
+    return FeedOptions(mode=mode, label=label, interval=interval, digest_time=digest_time)
+
+
 def _looks_like_channel_id(value: str) -> bool:
     return bool(YOUTUBE_CHANNEL_ID_RE.fullmatch((value or "").strip()))
 
 
+def _looks_like_playlist_id(value: str) -> bool:
+    return bool(YOUTUBE_PLAYLIST_ID_RE.fullmatch((value or "").strip()))
+
+
 def _render_transcript_txt(segments: list[TranscriptSegment]) -> str:
     lines: list[str] = []
     for segment in segments:
@@ -572,13 +715,134 @@ def _mark_seen_keyboard(
     return InlineKeyboardMarkup(inline_keyboard=inline_rows)
 
 
+_HTTP_SESSION: Optional[aiohttp.ClientSession] = None
+_HTTP_SESSION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _get_http_session() -> aiohttp.ClientSession:
+    """Return the shared HTTP session for YouTube page lookups (keep-alive, DNS cache)."""
+    global _HTTP_SESSION, _HTTP_SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed and _HTTP_SESSION_LOOP is not loop:
+        # Left over from a finished event loop; its sockets died with that loop.
+        try:
+            await _HTTP_SESSION.close()
+        except RuntimeError:
+            pass
+    if _HTTP_SESSION is None or _HTTP_SESSION.closed or _HTTP_SESSION_LOOP is not loop:
+        _HTTP_SESSION = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=10),
+            headers={"User-Agent": USER_AGENT},
+            connector=aiohttp.TCPConnector(
+                # Lookups all go to youtube.com; keep idle connections long enough that
+                # back-to-back /youtube commands skip the TLS handshake.
+                limit=32,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+                ssl=build_ssl_context(insecure=False, ca_bundle=None),
+            ),
+        )
+        _HTTP_SESSION_LOOP = loop
+    return _HTTP_SESSION
+
+
+async def close_http_session() -> None:
+    global _HTTP_SESSION, _HTTP_SESSION_LOOP
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed:
+        await _HTTP_SESSION.close()
+    _HTTP_SESSION = None
+    _HTTP_SESSION_LOOP = None
+
+
+# page URL -> (resolved_at monotonic, channel_id); LRU order, oldest first
+_CHANNEL_ID_CACHE: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+
+def _cached_channel_id(page_url: str) -> Optional[str]:
+    entry = _CHANNEL_ID_CACHE.get(page_url)
+    if entry is None:
+        return None
+    resolved_at, channel_id = entry
+    if time.monotonic() - resolved_at > CHANNEL_ID_CACHE_TTL_SEC:
+        del _CHANNEL_ID_CACHE[page_url]
+        return None
+    _CHANNEL_ID_CACHE.move_to_end(page_url)
+    return channel_id
+
+
+def _remember_channel_id(page_url: str, channel_id: str) -> None:
+    _CHANNEL_ID_CACHE[page_url] = (time.monotonic(), channel_id)
+    _CHANNEL_ID_CACHE.move_to_end(page_url)
+    while len(_CHANNEL_ID_CACHE) > CHANNEL_ID_CACHE_MAX:
+        _CHANNEL_ID_CACHE.popitem(last=False)
+
+
+async def _fetch_and_extract_channel_id(page_url: str) -> Optional[str]:
+    """GET a YouTube channel page once and return the first channel_id it reveals.
+
+    Checks, in order: the redirect target path, the <head> canonical/og:url tags, the
+    JSON anchors, and finally the HTML fallback over what was read.
+    """
+    session = await _get_http_session()
+    buf = bytearray()
+    head_parser = ChannelHeadParser()
+    decoder = codecs.getincrementaldecoder("utf-8")("ignore")
+    async with session.get(page_url) as resp:
+        # Error pages (404 for a missing handle, 429, 5xx) can still mention unrelated
+        # channel ids; treat them as "not found" like the old urllib lookup did.
+        if not 200 <= resp.status < 300:
+            return None
+        channel_id = extract_from_path(urlparse(str(resp.url)).path)
+        if channel_id:
+            return channel_id
+        # The canonical link and JSON anchors sit in the first few dozen KB: stop
+        # downloading as soon as one shows up instead of reading the whole channel page.
+        async for chunk in resp.content.iter_chunked(YOUTUBE_PAGE_CHUNK_BYTES):
+            if not head_parser.done:
+                head_parser.feed(decoder.decode(chunk))
+                if head_parser.channel_id:
+                    return head_parser.channel_id
+            # Rescan only the new chunk plus enough overlap for an anchor split across chunks
+            scan_from = max(0, len(buf) - YOUTUBE_ANCHOR_OVERLAP_BYTES)
+            buf.extend(chunk)
+            channel_id = extract_from_json_anchors(bytes(buf[scan_from:]))
+            if channel_id:
+                return channel_id
+            if len(buf) >= YOUTUBE_PAGE_MAX_BYTES:
+                break
+    return extract_from_html(buf.decode("utf-8", "ignore"))
+
+
 async def _extract_youtube_channel_id(url: str) -> Optional[str]:
-    """Extract YouTube channel_id from a URL using utils.yt_channel_id."""
+    """Extract YouTube channel_id from a URL using utils.yt_channel_id helpers."""
+    m = YOUTUBE_CHANNEL_URL_RE.search(url or "")
+    if m and m.lastgroup == "channel_id":
+        # Direct /channel/<id> link: no page fetch needed.
+        return m.group("channel_id")
     try:
-        return await asyncio.to_thread(get_channel_id, url)
+        if m:
+            # @handle, /c/<name>, /user/<name>: fetch the canonical page, which also gives
+            # one cache key regardless of scheme, host prefix or query string.
+            page_url = YOUTUBE_CHANNEL_PAGE_TMPL[m.lastgroup] % m.group(m.lastgroup)
+        else:
+            page_url = normalize_url(url or "")
+            parsed = urlparse(page_url)
+            if not parsed.netloc:
+                raise ValueError("invalid url")
+            channel_id = extract_from_path(parsed.path)
+            if channel_id:
+                return channel_id
+        # Remember the answer so re-adding the same channel skips the network.
+        channel_id = _cached_channel_id(page_url)
+        if channel_id:
+            return channel_id
+        channel_id = await _fetch_and_extract_channel_id(page_url)
+        if channel_id:
+            _remember_channel_id(page_url, channel_id)
+        return channel_id
     except Exception as exc:
         logging.warning(
-            "Failed to extract channel_id from %s via utils.yt_channel_id: %s",
+            "Failed to extract channel_id from %s: %s",
             url,
             exc,
             exc_info=True,
@@ -728,23 +992,24 @@ async def _run_whisper_transcription_to_txt(
     send_text: Callable[[str], Awaitable[None]],
     send_document: Callable[[BufferedInputFile, str], Awaitable[None]],
 ) -> None:
+    settings = DEPS.settings
     await send_text("Запускаю Whisper-транскрибацию. Это может занять 30-180 секунд.")
 
     try:
         transcript_text = await asyncio.to_thread(
             transcribe_video_with_whisper,
             video_id,
-            model=str(getattr(DEPS.settings, "AI_SUMMARIZER_WHISPER_MODEL", "whisper-1")),
-            api_key=getattr(DEPS.settings, "OPENAI_API_KEY", None),
+            model=str(getattr(settings, "AI_SUMMARIZER_WHISPER_MODEL", "whisper-1")),
+            api_key=getattr(settings, "OPENAI_API_KEY", None),
             max_audio_megabytes=max(
                 8,
-                int(getattr(DEPS.settings, "AI_SUMMARIZER_WHISPER_MAX_AUDIO_MB", 24)),
+                int(getattr(settings, "AI_SUMMARIZER_WHISPER_MAX_AUDIO_MB", 24)),
             ),
             download_timeout_sec=max(
                 20,
-                int(getattr(DEPS.settings, "AI_SUMMARIZER_WHISPER_DOWNLOAD_TIMEOUT_SEC", 240)),
+                int(getattr(settings, "AI_SUMMARIZER_WHISPER_DOWNLOAD_TIMEOUT_SEC", 240)),
             ),
-            yt_dlp_binary=str(getattr(DEPS.settings, "AI_SUMMARIZER_WHISPER_YTDLP_BINARY", "yt-dlp")),
+            yt_dlp_binary=str(getattr(settings, "AI_SUMMARIZER_WHISPER_YTDLP_BINARY", "yt-dlp")),
         )
     except (WhisperTranscriptionError, ValueError) as exc:
         await send_text(f"Не удалось сделать Whisper-транскрибацию: {exc}")
@@ -769,6 +1034,7 @@ async def _run_whisper_transcription_to_txt(
 
 @router.message(Command("audio"))
 async def cmd_audio(message: Message) -> None:
+    settings = DEPS.settings
     user_id = _ensure_user_id(message)
     if not user_id:
         await message.answer("Доступ запрещен.")
@@ -789,7 +1055,7 @@ async def cmd_audio(message: Message) -> None:
         info = await asyncio.to_thread(
             fetch_video_info,
             video_id,
-            yt_dlp_binary=str(getattr(DEPS.settings, "AI_SUMMARIZER_WHISPER_YTDLP_BINARY", "yt-dlp")),
+            yt_dlp_binary=str(getattr(settings, "AI_SUMMARIZER_WHISPER_YTDLP_BINARY", "yt-dlp")),
             timeout_sec=60,
         )
         title = (info.title or "").strip()
@@ -798,7 +1064,7 @@ async def cmd_audio(message: Message) -> None:
     except Exception:
         info_text = f"Оригинал: {watch_url}"
 
-    max_audio_send_bytes = int(getattr(DEPS.settings, "AI_AUDIO_EXPORT_MAX_BYTES", 48 * 1024 * 1024))
+    max_audio_send_bytes = int(getattr(settings, "AI_AUDIO_EXPORT_MAX_BYTES", 48 * 1024 * 1024))
 
     try:
         with TemporaryDirectory(prefix="yt_audio_export_") as tmp_dir:
@@ -806,10 +1072,12 @@ async def cmd_audio(message: Message) -> None:
                 download_audio_for_export,
                 video_id,
                 output_dir=Path(tmp_dir),
-                yt_dlp_binary=str(getattr(DEPS.settings, "AI_SUMMARIZER_WHISPER_YTDLP_BINARY", "yt-dlp")),
+                yt_dlp_binary=str(
+                    getattr(settings, "AI_SUMMARIZER_WHISPER_YTDLP_BINARY", "yt-dlp")
+                ),
                 timeout_sec=max(
                     20,
-                    int(getattr(DEPS.settings, "AI_SUMMARIZER_WHISPER_DOWNLOAD_TIMEOUT_SEC", 240)),
+                    int(getattr(settings, "AI_SUMMARIZER_WHISPER_DOWNLOAD_TIMEOUT_SEC", 240)),
                 ),
             )
             audio_size = audio_path.stat().st_size
@@ -1224,7 +1492,7 @@ async def cmd_youtube(message: Message) -> None:
     if not user_id:
         await message.answer("Доступ запрещен.")
         return
-    parts = (message.text or "").split(maxsplit=1)
+    parts = (message.text or "").split()
     if len(parts) < 2:
         await message.answer(
             "Использование: /youtube <youtube_link> [mode=immediate|digest|on_demand] [label=...] [interval=10] [time=HH:MM]\n\n"
@@ -1236,32 +1504,9 @@ async def cmd_youtube(message: Message) -> None:
         )
         return
     
-    # Extract URL and parse additional arguments
-    rest = parts[1]
-    # Split by spaces, URL is first part (may contain query params)
-    url_parts = rest.split()
-    youtube_url = url_parts[0]
-    
-    # Parse additional arguments
-    mode = "immediate"
-    label = None
-    interval = DEPS.settings.DEFAULT_POLL_INTERVAL_MIN
-    digest_time = None
-    for a in url_parts[1:]:
-        aval = a.strip().lower()
-        if aval in ("immediate", "digest", "on_demand"):
-            mode = aval
-        elif a.startswith("mode="):
-            mode = a.split("=", 1)[1]
-        elif a.startswith("label="):
-            label = a.split("=", 1)[1]
-        elif a.startswith("interval="):
-            try:
-                interval = int(a.split("=", 1)[1])
-            except Exception:
-                pass
-        elif a.startswith("time="):
-            digest_time = a.split("=", 1)[1] or None
+    # URL is the first argument (may contain query params), options follow
+    youtube_url = parts[1]
+    opts = _parse_feed_args(parts[2:], DEPS.settings)
     
     # Extract channel_id
     await message.answer("Определяю channel_id...")
@@ -1284,8 +1529,10 @@ async def cmd_youtube(message: Message) -> None:
         )
         return
     
-    url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
-    await _create_feed_and_seed_reply(message, user_id, url, mode, label, interval, digest_time)
+    url = YOUTUBE_CHANNEL_FEED_TMPL % channel_id
+    await _create_feed_and_seed_reply(
+        message, user_id, url, opts.mode, opts.label, opts.interval, opts.digest_time
+    )
 
 
 @router.message(Command("channel"))
@@ -1305,27 +1552,14 @@ async def cmd_channel(message: Message) -> None:
         )
         return
     channel_id = parts[1]
-    mode = "immediate"
-    label = None
-    interval = DEPS.settings.DEFAULT_POLL_INTERVAL_MIN
-    digest_time = None
-    for a in parts[2:]:
-        aval = a.strip().lower()
-        if aval in ("immediate", "digest", "on_demand"):
-            mode = aval
-        elif a.startswith("mode="):
-            mode = a.split("=", 1)[1]
-        elif a.startswith("label="):
-            label = a.split("=", 1)[1]
-        elif a.startswith("interval="):
-            try:
-                interval = int(a.split("=", 1)[1])
-            except Exception:
-                pass
-        elif a.startswith("time="):
-            digest_time = a.split("=", 1)[1] or None
-    url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
-    await _create_feed_and_seed_reply(message, user_id, url, mode, label, interval, digest_time)
+    if not _looks_like_channel_id(channel_id):
+        await message.answer("Некорректный channel_id: ожидается UC и 22 символа.")
+        return
+    opts = _parse_feed_args(parts[2:], DEPS.settings)
+    url = YOUTUBE_CHANNEL_FEED_TMPL % channel_id
+    await _create_feed_and_seed_reply(
+        message, user_id, url, opts.mode, opts.label, opts.interval, opts.digest_time
+    )
 
 
 @router.message(Command("playlist"))
@@ -1345,27 +1579,14 @@ async def cmd_playlist(message: Message) -> None:
         )
         return
     playlist_id = parts[1]
-    mode = "immediate"
-    label = None
-    interval = DEPS.settings.DEFAULT_POLL_INTERVAL_MIN
-    digest_time = None
-    for a in parts[2:]:
-        aval = a.strip().lower()
-        if aval in ("immediate", "digest", "on_demand"):
-            mode = aval
-        elif a.startswith("mode="):
-            mode = a.split("=", 1)[1]
-        elif a.startswith("label="):
-            label = a.split("=", 1)[1]
-        elif a.startswith("interval="):
-            try:
-                interval = int(a.split("=", 1)[1])
-            except Exception:
-                pass
-        elif a.startswith("time="):
-            digest_time = a.split("=", 1)[1] or None
-    url = f"https://www.youtube.com/feeds/videos.xml?playlist_id={playlist_id}"
-    await _create_feed_and_seed_reply(message, user_id, url, mode, label, interval, digest_time)
+    if not _looks_like_playlist_id(playlist_id):
+        await message.answer("Некорректный playlist_id.")
+        return
+    opts = _parse_feed_args(parts[2:], DEPS.settings)
+    url = YOUTUBE_PLAYLIST_FEED_TMPL % playlist_id
+    await _create_feed_and_seed_reply(
+        message, user_id, url, opts.mode, opts.label, opts.interval, opts.digest_time
+    )
 
 
 @router.message(Command("addfeed"))
@@ -1385,26 +1606,10 @@ async def cmd_addfeed(message: Message) -> None:
         )
         return
     url = parts[1]
-    mode = "immediate"
-    label = None
-    interval = DEPS.settings.DEFAULT_POLL_INTERVAL_MIN
-    digest_time = None
-    for a in parts[2:]:
-        aval = a.strip().lower()
-        if aval in ("immediate", "digest", "on_demand"):
-            mode = aval
-        elif a.startswith("mode="):
-            mode = a.split("=", 1)[1]
-        elif a.startswith("label="):
-            label = a.split("=", 1)[1]
-        elif a.startswith("interval="):
-            try:
-                interval = int(a.split("=", 1)[1])
-            except Exception:
-                pass
-        elif a.startswith("time="):
-            digest_time = a.split("=", 1)[1] or None
-    await _create_feed_and_seed_reply(message, user_id, url, mode, label, interval, digest_time)
+    opts = _parse_feed_args(parts[2:], DEPS.settings)
+    await _create_feed_and_seed_reply(
+        message, user_id, url, opts.mode, opts.label, opts.interval, opts.digest_time
+    )
 
 
 @router.message(Command("addeventsource"))
@@ -1432,20 +1637,24 @@ async def cmd_addeventsource(message: Message) -> None:
     url = parts[1]
     label = None
     interval = 1
-    source_type = "event_ics" if url.lower().split("?", 1)[0].endswith(".ics") else "event_json"
+    # Path without fragment/query: one partition each instead of building split() lists
+    url_path = url.partition("#")[0].partition("?")[0]
+    source_type = "event_ics" if url_path.lower().endswith(".ics") else "event_json"
     for a in parts[2:]:
-        aval = a.strip().lower()
-        if aval in {"json", "ics"}:
-            source_type = "event_ics" if aval == "ics" else "event_json"
-        elif a.startswith("type="):
-            tv = a.split("=", 1)[1].strip().lower()
+        key, sep, value = a.partition("=")
+        if not sep:
+            aval = a.lower()
+            if aval in {"json", "ics"}:
+                source_type = "event_ics" if aval == "ics" else "event_json"
+        elif key == "type":
+            tv = value.lower()
             if tv in {"json", "ics"}:
                 source_type = "event_ics" if tv == "ics" else "event_json"
-        elif a.startswith("label="):
-            label = a.split("=", 1)[1]
-        elif a.startswith("interval="):
+        elif key == "label":
+            label = value
+        elif key == "interval":
             try:
-                interval = max(1, int(a.split("=", 1)[1]))
+                interval = max(1, int(value))
             except Exception:
                 pass
     if source_type == "event_ics":
@@ -1538,8 +1747,8 @@ async def cmd_addevents(message: Message) -> None:
 
     with session_scope() as s:
         if feed_id is not None:
-            feed = s.get(Feed, feed_id)
-            if not feed or feed.user_id != user_id:
+            feed = _get_owned_feed(s, feed_id, user_id)
+            if not feed:
                 await message.answer("Лента не найдена.")
                 return
             if (feed.type or "").strip().lower() not in ("event_json", "event_ics", "event_manual"):
@@ -1577,8 +1786,7 @@ async def cmd_addevents(message: Message) -> None:
 
     assert feed_id is not None
 
-    settings = Settings()
-    parsed_items, errors = parse_bulk_events_text(body, settings.TZ)
+    parsed_items, errors = parse_bulk_events_text(body, DEPS.settings.TZ)
     if not parsed_items:
         err_preview = "\n".join(errors[:8]) if errors else "Нет корректных строк."
         await message.answer(f"События не добавлены.\n{err_preview}")
@@ -1606,8 +1814,9 @@ async def cmd_addevents(message: Message) -> None:
                 link=str(event["link"]),
                 published_at=event["published_at"],  # type: ignore[arg-type]
                 categories=["event_start"],
-                summary_hash=hashlib.sha1(
-                    f"{event['title']}\n{event['link']}\n{event['published_at']}".encode("utf-8")
+                summary_hash=hashlib.blake2b(
+                    f"{event['title']}\n{event['link']}\n{event['published_at']}".encode("utf-8"),
+                    digest_size=16,
                 ).hexdigest(),
             )
             s.add(it)
@@ -1616,8 +1825,9 @@ async def cmd_addevents(message: Message) -> None:
         if (feed.type or "").strip().lower() not in {"event_json", "event_ics"}:
             feed.type = "event_manual"
 
-    DEPS.scheduler.schedule_feed_poll(feed_id, poll_interval)
-    delivered = await DEPS.scheduler._deliver_due_event_starts(feed_id)
+    scheduler = DEPS.scheduler
+    scheduler.schedule_feed_poll(feed_id, poll_interval)
+    delivered = await scheduler._deliver_due_event_starts(feed_id)
 
     msg = (
         f"Готово. Лента id={feed_id}. Добавлено: {created}, обновлено: {updated}, "
@@ -1636,28 +1846,54 @@ async def cmd_list(message: Message) -> None:
         await message.answer("Доступ запрещен.")
         return
     with session_scope() as s:
-        feeds = s.query(Feed).filter(Feed.user_id == user_id).order_by(Feed.id.asc()).all()
-        if not feeds:
-            await message.answer(
-                "У вас нет лент. Используйте /addfeed, /channel, /playlist, /addeventsource или /addics."
+        # Only the columns rendered by _format_feed_list_line; rows are plain tuples,
+        # not ORM objects
+        feeds = s.execute(
+            select(
+                Feed.id,
+                Feed.enabled,
+                Feed.label,
+                Feed.name,
+                Feed.url,
+                Feed.mode,
+                Feed.type,
+                Feed.digest_time_local,
             )
-            return
-        lines = ["Ваши ленты:"]
-        for f in feeds:
-            lines.append(_format_feed_list_line(f))
-        await message.answer("\n".join(lines))
+            .where(Feed.user_id == user_id)
+            .order_by(Feed.id.asc())
+        ).all()
+    if not feeds:
+        await message.answer(
+            "У вас нет лент. Используйте /addfeed, /channel, /playlist, /addeventsource"
+            " или /addics."
+        )
+        return
+    await message.answer("Ваши ленты:\n" + "\n".join(_format_feed_list_line(f) for f in feeds))
 
 
-@router.message(Command("remove"))
-async def cmd_remove(message: Message) -> None:
-    """Удалить ленту."""
+def _get_owned_feed(s: Session, feed_id: int, user_id: int) -> Optional[Feed]:
+    """Load a feed only if it belongs to the user: one SELECT keyed on both columns."""
+    return s.scalars(select(Feed).where(Feed.id == feed_id, Feed.user_id == user_id)).first()
+
+
+async def _feed_action(
+    message: Message,
+    *,
+    command: str,
+    mutate: Callable[[Session, int, int], Optional[str]],
+) -> None:
+    """Shared `/<command> <feed_id>` flow: parse id, apply `mutate`, reply.
+
+    `mutate(s, feed_id, user_id)` runs inside the session, checks ownership as part of
+    its own statements, and returns the reply text or None if the user has no such feed.
+    """
     user_id = _ensure_user_id(message)
     if not user_id:
         await message.answer("Доступ запрещен.")
         return
     parts = (message.text or "").split()
     if len(parts) < 2:
-        await message.answer("Использование: /remove <feed_id>")
+        await message.answer(f"Использование: /{command} <feed_id>")
         return
     try:
         feed_id = int(parts[1])
@@ -1665,19 +1901,60 @@ async def cmd_remove(message: Message) -> None:
         await message.answer("Неверный id.")
         return
     with session_scope() as s:
-        feed = s.get(Feed, feed_id)
-        if not feed or feed.user_id != user_id:
-            await message.answer("Лента не найдена.")
-            return
-        # Unschedule polling
-        DEPS.scheduler.unschedule_feed_poll(feed_id)
-        # Delete feed (cascade will handle related items/deliveries/rules)
-        s.delete(feed)
-    await message.answer(f"Лента {feed_id} удалена.")
+        reply = mutate(s, feed_id, user_id)
+    await message.answer(reply or "Лента не найдена.")
+
+
+def _remove_feed(s: Session, feed_id: int, user_id: int) -> Optional[str]:
+    if s.scalar(select(1).where(Feed.id == feed_id, Feed.user_id == user_id).limit(1)) is None:
+        return None
+    # Unschedule polling
+    DEPS.scheduler.unschedule_feed_poll(feed_id)
+    # Delete dependent rows set-based (the ORM relationships do not cascade), then the feed
+    for model in (FeedRule, FeedBaseline, Delivery, Item):
+        s.query(model).filter(model.feed_id == feed_id).delete(synchronize_session=False)
+    s.query(Feed).filter(Feed.id == feed_id).delete(synchronize_session=False)
+    return f"Лента {feed_id} удалена."
+
+
+def _mute_feed(s: Session, feed_id: int, user_id: int) -> Optional[str]:
+    # Ownership check and mutation in one UPDATE
+    updated = (
+        s.query(Feed)
+        .filter(Feed.id == feed_id, Feed.user_id == user_id)
+        .update({Feed.enabled: False}, synchronize_session=False)
+    )
+    if not updated:
+        return None
+    # Unschedule polling
+    DEPS.scheduler.unschedule_feed_poll(feed_id)
+    return f"Лента {feed_id} отключена."
+
+
+def _unmute_feed(s: Session, feed_id: int, user_id: int) -> Optional[str]:
+    updated = (
+        s.query(Feed)
+        .filter(Feed.id == feed_id, Feed.user_id == user_id)
+        .update({Feed.enabled: True}, synchronize_session=False)
+    )
+    if not updated:
+        return None
+    # Reschedule polling
+    interval = s.query(Feed.poll_interval_min).filter(Feed.id == feed_id).scalar()
+    DEPS.scheduler.schedule_feed_poll(feed_id, interval)
+    return f"Лента {feed_id} включена."
+
+
+@router.message(Command("remove"))
+async def cmd_remove(message: Message) -> None:
+    """Удалить ленту."""
+    await _feed_action(message, command="remove", mutate=_remove_feed)
 
 
 @router.message(Command("setmode"))
 async def cmd_setmode(message: Message) -> None:
+    settings = DEPS.settings
+    scheduler = DEPS.scheduler
     user_id = _ensure_user_id(message)
     if not user_id:
         await message.answer("Доступ запрещен.")
@@ -1692,9 +1969,8 @@ async def cmd_setmode(message: Message) -> None:
         await message.answer("Неверный id.")
         return
 
-    mode = parts[2].strip().lower()
-    allowed_modes = {"immediate", "digest", "on_demand"}
-    if mode not in allowed_modes:
+    mode = parts[2].lower()
+    if mode not in FEED_MODES:
         await message.answer("Неверный режим. Доступные: immediate, digest, on_demand.")
         return
 
@@ -1721,15 +1997,15 @@ async def cmd_setmode(message: Message) -> None:
     for p in parts[3:]:
         if p.startswith("time="):
             digest_time_provided = True
-            digest_time_raw = p.split("=", 1)[1].strip()
+            digest_time_raw = p.split("=", 1)[1]
         else:
-            normalized = _normalize_hhmm(p.strip())
+            normalized = _normalize_hhmm(p)
             if normalized:
                 if digest_time_provided:
                     extra_parts.append(p)
                 else:
                     digest_time_provided = True
-                    digest_time_raw = p.strip()
+                    digest_time_raw = p
             else:
                 extra_parts.append(p)
 
@@ -1749,23 +2025,25 @@ async def cmd_setmode(message: Message) -> None:
             await message.answer("Время можно задавать только для режима digest.")
             return
     with session_scope() as s:
-        feed = s.get(Feed, feed_id)
-        if not feed or feed.user_id != user_id:
+        feed = _get_owned_feed(s, feed_id, user_id)
+        if not feed:
             await message.answer("Лента не найдена.")
             return
+        old_state = (feed.mode, feed.digest_time_local)
         feed.mode = mode
         if mode == "digest":
             if digest_time_provided:
                 feed.digest_time_local = digest_time
             elif not feed.digest_time_local:
-                feed.digest_time_local = DEPS.settings.DIGEST_DEFAULT_TIME
+                feed.digest_time_local = settings.DIGEST_DEFAULT_TIME
         else:
             feed.digest_time_local = None
         interval = feed.poll_interval_min
         new_mode = feed.mode
         new_time = feed.digest_time_local
-    # Reschedule polling job (unchanged interval)
-    DEPS.scheduler.schedule_feed_poll(feed_id, interval)
+    # Reschedule polling job (unchanged interval) only when something actually changed
+    if (new_mode, new_time) != old_state:
+        scheduler.schedule_feed_poll(feed_id, interval)
     if new_mode == "digest":
         await message.answer(f"Режим обновлён для ленты {feed_id}: digest, время {new_time}.")
     else:
@@ -1796,39 +2074,32 @@ async def cmd_setfilter(message: Message) -> None:
         await message.answer("Неверный id.")
         return
     try:
-        filter_data = json.loads(parts[2])
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so one handler covers both
+        filter_data = orjson.loads(parts[2]) if orjson is not None else json.loads(parts[2])
     except json.JSONDecodeError as e:
         await message.answer(f"Неверный JSON: {str(e)}")
         return
+    if not isinstance(filter_data, dict):
+        await message.answer("Неверный JSON: ожидается объект.")
+        return
+    # Only known rule columns, unknown keys are ignored
+    values = {
+        key: bool(value) if key in FILTER_BOOL_FIELDS else value
+        for key, value in filter_data.items()
+        if key in FILTER_FIELDS
+    }
     with session_scope() as s:
-        feed = s.get(Feed, feed_id)
-        if not feed or feed.user_id != user_id:
+        owned = s.scalar(select(Feed.id).where(Feed.id == feed_id, Feed.user_id == user_id))
+        if owned is None:
             await message.answer("Лента не найдена.")
             return
-        # Get or create rules
-        rules = feed.rules
-        if not rules:
-            rules = FeedRule(feed_id=feed_id)
-            s.add(rules)
-        # Update rules from JSON
-        if "include_keywords" in filter_data:
-            rules.include_keywords = filter_data["include_keywords"]
-        if "exclude_keywords" in filter_data:
-            rules.exclude_keywords = filter_data["exclude_keywords"]
-        if "include_regex" in filter_data:
-            rules.include_regex = filter_data["include_regex"]
-        if "exclude_regex" in filter_data:
-            rules.exclude_regex = filter_data["exclude_regex"]
-        if "require_all" in filter_data:
-            rules.require_all = bool(filter_data["require_all"])
-        if "case_sensitive" in filter_data:
-            rules.case_sensitive = bool(filter_data["case_sensitive"])
-        if "categories" in filter_data:
-            rules.categories = filter_data["categories"]
-        if "min_duration_sec" in filter_data:
-            rules.min_duration_sec = filter_data["min_duration_sec"]
-        if "max_duration_sec" in filter_data:
-            rules.max_duration_sec = filter_data["max_duration_sec"]
+        # Get-or-create plus update in one statement (feed_rules.feed_id is unique)
+        stmt = sqlite_insert(FeedRule).values(feed_id=feed_id, **values)
+        if values:
+            stmt = stmt.on_conflict_do_update(index_elements=[FeedRule.feed_id], set_=values)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[FeedRule.feed_id])
+        s.execute(stmt)
     await message.answer("Фильтры обновлены.")
 
 
@@ -1838,6 +2109,7 @@ async def cmd_digest(message: Message) -> None:
 
     Формат: /digest [feed_id|all]
     """
+    scheduler = DEPS.scheduler
     user_id = _ensure_user_id(message)
     if not user_id:
         await message.answer("Доступ запрещен.")
@@ -1849,80 +2121,48 @@ async def cmd_digest(message: Message) -> None:
     arg = parts[1].lower()
     with session_scope() as s:
         if arg == "all":
-            feeds = s.query(Feed).filter(Feed.user_id == user_id, Feed.enabled == True).all()
-            feed_ids = [f.id for f in feeds]
+            feed_ids = s.scalars(
+                select(Feed.id).where(Feed.user_id == user_id, Feed.enabled.is_(True))
+            ).all()
         else:
             try:
                 feed_id = int(arg)
             except Exception:
                 await message.answer("Неверный id.")
                 return
-            feed = s.get(Feed, feed_id)
-            if not feed or feed.user_id != user_id:
+            feed = _get_owned_feed(s, feed_id, user_id)
+            if not feed:
                 await message.answer("Лента не найдена.")
                 return
             feed_ids = [feed_id]
     if not feed_ids:
         await message.answer("Нет активных лент для дайджеста.")
         return
-    # Send digest for each feed
+    # One feed after another: every digest goes to the same chat, so concurrent sends
+    # would interleave messages and run into Telegram's per-chat limit.
+    failed = 0
     for fid in feed_ids:
-        await DEPS.scheduler._send_digest_for_feed(fid, update_last_digest_at=False)
-    await message.answer(f"Дайджест отправлен для {len(feed_ids)} лент.")
+        try:
+            await scheduler._send_digest_for_feed(fid, update_last_digest_at=False)
+        except Exception as exc:
+            failed += 1
+            logging.error("Manual digest failed for feed_id=%s: %s", fid, exc, exc_info=True)
+    msg = f"Дайджест отправлен для {len(feed_ids) - failed} лент."
+    if failed:
+        msg += f" Ошибок: {failed}."
+    await message.answer(msg)
 
 
 @router.message(Command("mute"))
 async def cmd_mute(message: Message) -> None:
     """Отключить ленту (временно)."""
-    user_id = _ensure_user_id(message)
-    if not user_id:
-        await message.answer("Доступ запрещен.")
-        return
-    parts = (message.text or "").split()
-    if len(parts) < 2:
-        await message.answer("Использование: /mute <feed_id>")
-        return
-    try:
-        feed_id = int(parts[1])
-    except Exception:
-        await message.answer("Неверный id.")
-        return
-    with session_scope() as s:
-        feed = s.get(Feed, feed_id)
-        if not feed or feed.user_id != user_id:
-            await message.answer("Лента не найдена.")
-            return
-        feed.enabled = False
-        # Unschedule polling
-        DEPS.scheduler.unschedule_feed_poll(feed_id)
-    await message.answer(f"Лента {feed_id} отключена.")
+    await _feed_action(message, command="mute", mutate=_mute_feed)
 
 
 @router.message(Command("unmute"))
 async def cmd_unmute(message: Message) -> None:
     """Включить ленту."""
-    user_id = _ensure_user_id(message)
-    if not user_id:
-        await message.answer("Доступ запрещен.")
-        return
-    parts = (message.text or "").split()
-    if len(parts) < 2:
-        await message.answer("Использование: /unmute <feed_id>")
-        return
-    try:
-        feed_id = int(parts[1])
-    except Exception:
-        await message.answer("Неверный id.")
-        return
-    with session_scope() as s:
-        feed = s.get(Feed, feed_id)
-        if not feed or feed.user_id != user_id:
-            await message.answer("Лента не найдена.")
-            return
-        feed.enabled = True
-        # Reschedule polling
-        DEPS.scheduler.schedule_feed_poll(feed_id, feed.poll_interval_min)
-    await message.answer(f"Лента {feed_id} включена.")
+    await _feed_action(message, command="unmute", mutate=_unmute_feed)
 
 
 # Removed latest inspector
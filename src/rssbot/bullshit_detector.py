@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import calendar
 from dataclasses import dataclass
 from pathlib import Path
 import re
@@ -12,6 +11,7 @@ import aiohttp
 import feedparser
 
 from .config import Settings
+from .rss import entry_published_at, get_feed_http_session, parse_feed
 from .youtube_summarize import SummarizationError, summarize_text_with_openai
 from .youtube_transcribe import (
     TranscriptError,
@@ -184,13 +184,8 @@ def _extract_video_id_from_entry(entry: feedparser.FeedParserDict) -> str | None
 
 
 def _entry_published_ts(entry: feedparser.FeedParserDict) -> int:
-    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
-    if parsed:
-        try:
-            return int(calendar.timegm(parsed))
-        except Exception:
-            return 0
-    return 0
+    published = entry_published_at(entry)
+    return int(published.timestamp()) if published else 0
 
 
 def score_video_suspicion(title: str, description: str = "") -> tuple[int, tuple[str, ...]]:
@@ -263,16 +258,16 @@ async def fetch_channel_latest_videos(
 ) -> list[ChannelVideo]:
     feed_url = _channel_feed_url(channel_id)
     timeout = aiohttp.ClientTimeout(total=max(8, timeout_sec))
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        async with session.get(feed_url) as response:
-            if response.status >= 400:
-                raise BullshitDetectorError(
-                    f"YouTube RSS вернул статус {response.status} для канала {channel_id}."
-                )
-            payload = await response.read()
+    session = await get_feed_http_session()
+    async with session.get(feed_url, timeout=timeout) as response:
+        if response.status >= 400:
+            raise BullshitDetectorError(
+                f"YouTube RSS вернул статус {response.status} для канала {channel_id}."
+            )
+        payload = await response.read()
 
-    parsed = feedparser.parse(payload)
-    entries = list(getattr(parsed, "entries", []) or [])
+    parsed = await asyncio.to_thread(parse_feed, payload)
+    entries = list(parsed.get("entries") or [])
     if not entries:
         raise BullshitDetectorError("В YouTube RSS нет доступных видео для анализа.")
 
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -206,6 +207,24 @@ class Settings(BaseSettings):
                 continue
         return result
 
+    @cached_property
+    def allowed_chat_id_set(self) -> Optional[FrozenSet[int]]:
+        """allowed_chat_ids() parsed once into a set; None means every chat is allowed."""
+        allowed = self.allowed_chat_ids()
+        return frozenset(allowed) if allowed else None
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Process-wide settings, read from the environment on first use."""
+    return Settings()
+
+
+def reload_settings() -> Settings:
+    """Drop the cached settings and read them again."""
+    get_settings.cache_clear()
+    return get_settings()
+
 
 def ensure_data_dir(path: Path) -> None:
     if path.suffix:
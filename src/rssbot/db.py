@@ -16,9 +16,11 @@ from sqlalchemy import (
     String,
     UniqueConstraint,
     create_engine,
+    event,
     func,
 )
 from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, relationship, sessionmaker
 
 
@@ -57,9 +59,16 @@ class Feed(Base):
 
     http_etag: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
     http_last_modified: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    # Digest of the last parsed body; lets polls skip parsing when a 200 repeats it.
+    http_body_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
 
     last_poll_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     last_digest_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # When the digest scanner next fires for this feed; NULL until first computed
+    # and reset whenever the schedule changes.
+    next_digest_at_utc: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True, index=True
+    )
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
@@ -68,6 +77,17 @@ class Feed(Base):
     items: Mapped[Iterable["Item"]] = relationship("Item", back_populates="feed")
 
 
+@event.listens_for(Feed.digest_time_local, "set")
+@event.listens_for(Feed.mode, "set")
+def _reset_next_digest_at(target: Feed, value, oldvalue, _initiator) -> None:
+    # The scanner recomputes the next fire time on its next tick. Attribute events
+    # only see ORM assignments: a Core update(Feed) of mode/digest_time_local, or any
+    # future edit of User.tz, must set next_digest_at_utc = NULL itself, or digests
+    # keep firing at the old time.
+    if value != oldvalue:
+        target.next_digest_at_utc = None
+
+
 class FeedRule(Base):
     __tablename__ = "feed_rules"
 
@@ -93,7 +113,8 @@ class Item(Base):
     __table_args__ = (UniqueConstraint("feed_id", "external_id", name="uq_feed_item"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    feed_id: Mapped[int] = mapped_column(ForeignKey("feeds.id"), nullable=False, index=True)
+    # Lookups by feed_id are served by the leading column of uq_feed_item.
+    feed_id: Mapped[int] = mapped_column(ForeignKey("feeds.id"), nullable=False)
     external_id: Mapped[str] = mapped_column(String(128), nullable=False)
 
     title: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
@@ -142,13 +163,70 @@ class FeedBaseline(Base):
 _SessionLocal: Optional[sessionmaker[Session]] = None
 _engine: Optional[Engine] = None
 
+# Applied to every new SQLite connection. WAL with synchronous=NORMAL avoids an
+# fsync per commit on the polling hot path; busy_timeout lets writers wait for
+# each other instead of failing with "database is locked".
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Connections kept open between sessions so the page cache and WAL handles
+# survive across polls; overflow connections are closed on check-in.
+SQLITE_POOL_SIZE = 8
+SQLITE_POOL_OVERFLOW = 8
+
+
+# Columns added after the first release. create_all() does not alter existing
+# tables, so init_engine adds any that are missing.
+ADDED_COLUMNS = (
+    ("feeds", "http_body_hash", "VARCHAR(32)"),
+    ("feeds", "next_digest_at_utc", "DATETIME"),
+)
+
+
+def _add_missing_columns(conn) -> None:
+    for table, column, ddl in ADDED_COLUMNS:
+        existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+def _set_sqlite_pragmas(dbapi_conn, _connection_record) -> None:
+    cur = dbapi_conn.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cur.execute(pragma)
+    finally:
+        cur.close()
+
 
 def init_engine(db_path: Path) -> Engine:
     global _engine, _SessionLocal
     # Ensure directory exists
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    engine = create_engine(f"sqlite:///{db_path}", future=True, connect_args={"check_same_thread": False})
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=SQLITE_POOL_SIZE,
+        max_overflow=SQLITE_POOL_OVERFLOW,
+        pool_recycle=-1,
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
     Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        _add_missing_columns(conn)
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_feeds_next_digest_at_utc ON feeds (next_digest_at_utc)"
+        )
+        # Redundant with uq_feed_item; left behind by databases created earlier.
+        conn.exec_driver_sql("DROP INDEX IF EXISTS ix_items_feed_id")
     _engine = engine
     _SessionLocal = sessionmaker(
         bind=engine,
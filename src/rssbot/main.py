@@ -1,17 +1,19 @@
 from __future__ import annotations
 
 import asyncio
+from functools import partial
 import logging
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from sqlalchemy import select
 
-from .bot import router, set_deps
-from .config import Settings, ensure_data_dir
+from .bot import close_http_session, router, set_deps
+from .config import ensure_data_dir, get_settings
 from .db import Feed, init_engine, session_scope
 from .scheduler import BotScheduler
-from .rss import fetch_and_store_recent
+from .rss import close_feed_http_session, fetch_and_store_many, fetch_and_store_recent
 from . import web as webui
 from aiohttp import web
 
@@ -20,7 +22,7 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name
 
 
 async def app() -> None:
-    settings = Settings()
+    settings = get_settings()
     ensure_data_dir(settings.DB_PATH)
     init_engine(settings.DB_PATH)
 
@@ -40,27 +42,18 @@ async def app() -> None:
 
     # Schedule polling for existing enabled feeds
     with session_scope() as s:
-        feed_ids = [f.id for f in s.query(Feed).filter(Feed.enabled == True).all()]
-        for fid in feed_ids:
-            feed = s.get(Feed, fid)
-            scheduler.schedule_feed_poll(feed.id, feed.poll_interval_min)
+        feeds = s.execute(
+            select(Feed.id, Feed.poll_interval_min).where(Feed.enabled.is_(True))
+        ).all()
+    feed_ids = [fid for fid, _ in feeds]
+    for fid, poll_interval_min in feeds:
+        scheduler.schedule_feed_poll(fid, poll_interval_min)
 
     # Optional backfill on startup (store last N unseen items without sending)
     backfill_n = settings.BACKFILL_ON_START_N
     if backfill_n and backfill_n > 0:
-        async def _backfill_all(ids: list[int]) -> None:
-            sem = asyncio.Semaphore(3)
-
-            async def worker(fid: int) -> None:
-                async with sem:
-                    try:
-                        await fetch_and_store_recent(fid, backfill_n)
-                    except Exception:
-                        pass
-
-            await asyncio.gather(*(worker(i) for i in ids))
-
-        await _backfill_all(feed_ids)
+        # Failures are returned per feed and ignored; the regular poll retries them
+        await fetch_and_store_many(feed_ids, partial(fetch_and_store_recent, limit=backfill_n))
 
     # Start web UI
     web_app = webui.create_app(settings, scheduler)
@@ -74,6 +67,8 @@ async def app() -> None:
         await dp.start_polling(bot)
     finally:
         await runner.cleanup()
+        await close_http_session()
+        await close_feed_http_session()
 
 
 def main() -> None:
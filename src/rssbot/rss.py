@@ -4,16 +4,56 @@ import asyncio
 import hashlib
 import calendar
 import json
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Optional, Tuple, Union
 from zoneinfo import ZoneInfo
 import re
+import xml.etree.ElementTree as ET
 
 import aiohttp
 import feedparser
+from sqlalchemy import select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional speedup
+    orjson = None
 
 from .db import Feed, Item, session_scope
-from .config import Settings
+from .config import get_settings
+
+# DD.MM[.YYYY] with an optional HH:MM, e.g. "Стрим 12.03 19:00"
+AVAILABILITY_DATE_RE = re.compile(
+    r"(\d{1,2})\.(\d{1,2})(?:\.(\d{2,4}))?(?:\D{1,3}(\d{1,2}):(\d{2}))?"
+)
+# "DD.MM.YYYY HH:MM" fallback for event payloads
+EVENT_DOT_DATE_RE = re.compile(r"^\s*(\d{1,2})\.(\d{1,2})\.(\d{4})\s+(\d{1,2}):(\d{2})\s*$")
+URL_RE = re.compile(r"https?://[^\s<>()]+")
+SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=128)
+def get_zoneinfo(name: str) -> ZoneInfo:
+    """ZoneInfo for an IANA name, cached; raises for unknown names like ZoneInfo does."""
+    return ZoneInfo(name)
+
+
+@lru_cache(maxsize=128)
+def _zoneinfo_or_none(name: str) -> Optional[ZoneInfo]:
+    """Like get_zoneinfo, but unknown names (e.g. Windows TZIDs in ICS) are cached as None."""
+    try:
+        return get_zoneinfo(name)
+    except Exception:
+        return None
+
+
+def _default_tz() -> ZoneInfo:
+    """Configured default timezone (follows reload_settings())."""
+    return get_zoneinfo(get_settings().TZ or "UTC")
 
 
 def _extract_video_id(entry: feedparser.FeedParserDict) -> Optional[str]:
@@ -27,19 +67,24 @@ def _extract_video_id(entry: feedparser.FeedParserDict) -> Optional[str]:
     return None
 
 
-def _published_at(entry: feedparser.FeedParserDict) -> Optional[datetime]:
+def _entry_external_id(entry: feedparser.FeedParserDict) -> str:
+    return _extract_video_id(entry) or (entry.get("id") or "").strip()
+
+
+def entry_published_at(entry: feedparser.FeedParserDict) -> Optional[datetime]:
     """Return published/updated datetime in UTC.
 
-    feedparser v6 provides struct_time in entry.published_parsed/updated_parsed.
-    Use calendar.timegm to get correct UTC epoch instead of deprecated helpers.
+    feedparser v6 provides UTC struct_time in entry.published_parsed/updated_parsed.
     """
     try:
-        if entry.get("published_parsed"):
-            ts = calendar.timegm(entry.published_parsed)
-            return datetime.fromtimestamp(int(ts), tz=timezone.utc)
-        if entry.get("updated_parsed"):
-            ts = calendar.timegm(entry.updated_parsed)
-            return datetime.fromtimestamp(int(ts), tz=timezone.utc)
+        st = entry.get("published_parsed") or entry.get("updated_parsed")
+        if st:
+            try:
+                return datetime(st[0], st[1], st[2], st[3], st[4], st[5], tzinfo=timezone.utc)
+            except ValueError:
+                # Out-of-range fields such as leap seconds: calendar.timegm
+                # normalises them like before.
+                return datetime.fromtimestamp(calendar.timegm(st), tz=timezone.utc)
     except Exception:
         pass
     # Fallback: try to parse ISO strings if present
@@ -58,15 +103,177 @@ def _published_at(entry: feedparser.FeedParserDict) -> Optional[datetime]:
     return None
 
 
+_EPOCH = datetime.fromtimestamp(0, tz=timezone.utc)
+
+
+def _dated_entries(
+    entries: List[feedparser.FeedParserDict],
+) -> List[Tuple[Optional[datetime], feedparser.FeedParserDict]]:
+    """Pair entries with their publish time so it is computed once for sorting and storing."""
+    return [(entry_published_at(e), e) for e in entries]
+
+
+def _entry_sort_key(dated: Tuple[Optional[datetime], feedparser.FeedParserDict]) -> datetime:
+    return dated[0] or _EPOCH
+
+
 def _summary_hash(entry: feedparser.FeedParserDict) -> Optional[str]:
     text = (entry.get("summary") or entry.get("description") or "").strip()
     if not text:
         return None
-    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+YOUTUBE_FEED_NS = {
+    "a": "http://www.w3.org/2005/Atom",
+    "yt": "http://www.youtube.com/xml/schemas/2015",
+    "media": "http://search.yahoo.com/mrss/",
+}
+_YOUTUBE_FEED_MARKER = YOUTUBE_FEED_NS["yt"].encode("ascii")
+
+
+def _youtube_text(node: ET.Element, path: str) -> Optional[str]:
+    # feedparser strips surrounding whitespace from text elements; match it
+    text = node.findtext(path, None, YOUTUBE_FEED_NS)
+    return text.strip() if text is not None else None
+
+
+def _parse_youtube_feed(content: bytes) -> Optional[dict[str, Any]]:
+    """Extract the fields we store from a YouTube Atom feed with ElementTree.
+
+    Returns a feedparser-shaped mapping (``feed.title`` and ``entries``) or None when
+    the payload is not a well-formed YouTube feed, so the caller can fall back to
+    feedparser.
+    """
+    if _YOUTUBE_FEED_MARKER not in content:
+        return None
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        return None
+    if root.tag != "{%s}feed" % YOUTUBE_FEED_NS["a"]:
+        return None
+
+    entries: list[dict[str, Any]] = []
+    for node in root.iterfind("a:entry", YOUTUBE_FEED_NS):
+        entry: dict[str, Any] = {
+            "id": _youtube_text(node, "a:id") or "",
+            "title": _youtube_text(node, "a:title"),
+            "author": _youtube_text(node, "a:author/a:name"),
+            "published": _youtube_text(node, "a:published"),
+            "updated": _youtube_text(node, "a:updated"),
+            "summary": _youtube_text(node, "media:group/media:description"),
+            "tags": [
+                {"term": c.get("term")}
+                for c in node.iterfind("a:category", YOUTUBE_FEED_NS)
+                if c.get("term")
+            ],
+        }
+        video_id = _youtube_text(node, "yt:videoId")
+        if video_id and not entry["id"]:
+            entry["id"] = f"yt:video:{video_id}"
+        for link in node.iterfind("a:link", YOUTUBE_FEED_NS):
+            if link.get("rel", "alternate") == "alternate":
+                entry["link"] = link.get("href")
+                break
+        entries.append(entry)
+    return {"feed": {"title": _youtube_text(root, "a:title")}, "entries": entries}
+
+
+def parse_feed(content: bytes) -> Any:
+    """Parse a feed payload, taking the ElementTree fast path for YouTube feeds.
+
+    CPU-bound (feedparser sanitises HTML in pure Python); async callers run it via
+    asyncio.to_thread so other polls keep going meanwhile.
+    """
+    parsed = _parse_youtube_feed(content)
+    if parsed is None:
+        parsed = feedparser.parse(content)
+    return parsed
+
+
+def _extract_categories(entry: feedparser.FeedParserDict) -> list[str]:
+    return [t.get("term") if isinstance(t, dict) else t for t in (entry.get("tags") or ())]
+
+
+def _item_row(
+    feed_id: int,
+    external_id: str,
+    entry: feedparser.FeedParserDict,
+    published_at: Optional[datetime],
+) -> dict[str, Any]:
+    return {
+        "feed_id": feed_id,
+        "external_id": external_id,
+        "title": entry.get("title"),
+        "link": entry.get("link"),
+        "author": (entry.get("author") or (entry.get("author_detail") or {}).get("name")),
+        "published_at": published_at,
+        "categories": _extract_categories(entry),
+        "summary_hash": _summary_hash(entry),
+    }
+
+
+def _store_new_entries(
+    s: Session,
+    feed_id: int,
+    entries: List[feedparser.FeedParserDict],
+    limit: Optional[int] = None,
+    published: Optional[List[Optional[datetime]]] = None,
+) -> List[int]:
+    """Insert entries not stored for the feed yet and return the new Item IDs in entry order.
+
+    Duplicates are resolved with one IN lookup and new rows are written with one bulk
+    INSERT ... ON CONFLICT DO NOTHING, instead of a SELECT and a flush per entry.
+    ``published`` optionally carries already computed publish times, parallel to
+    ``entries``.
+    """
+    candidates: dict[str, int] = {}
+    for idx, e in enumerate(entries):
+        vid = _entry_external_id(e)
+        if vid and vid not in candidates:
+            candidates[vid] = idx
+    if not candidates:
+        return []
+    existing = set(
+        s.scalars(
+            select(Item.external_id).where(
+                Item.feed_id == feed_id, Item.external_id.in_(candidates)
+            )
+        )
+    )
+    missing = [(vid, idx) for vid, idx in candidates.items() if vid not in existing]
+    if limit is not None:
+        missing = missing[: max(0, limit)]
+    if not missing:
+        return []
+    rows = [
+        _item_row(
+            feed_id,
+            vid,
+            entries[idx],
+            published[idx] if published is not None else entry_published_at(entries[idx]),
+        )
+        for vid, idx in missing
+    ]
+    # A concurrent poll of the same feed (scheduler vs. backfill) may have stored some
+    # of these since the lookup; let the unique constraint skip them.
+    stmt = (
+        sqlite_insert(Item)
+        .on_conflict_do_nothing(index_elements=[Item.feed_id, Item.external_id])
+        .returning(Item.external_id, Item.id)
+    )
+    created = {vid: item_id for vid, item_id in s.execute(stmt, rows)}
+    return [created[vid] for vid, _ in missing if vid in created]
 
 
 def event_identity_hash(title: str, published_at: datetime) -> str:
-    normalized_title = re.sub(r"\s+", " ", (title or "")).strip().casefold()
+    """Stable fingerprint of an event, matched against stored Item.summary_hash.
+
+    Kept on SHA-1 (like the fallback external ids below): changing the digest
+    would make every stored event look new and re-send its notification.
+    """
+    normalized_title = SPACE_RE.sub(" ", (title or "")).strip().casefold()
     published_utc = (
         published_at.replace(tzinfo=timezone.utc)
         if published_at.tzinfo is None
@@ -78,6 +285,11 @@ def event_identity_hash(title: str, published_at: datetime) -> str:
     return hashlib.sha1(seed.encode("utf-8")).hexdigest()
 
 
+# DTSTART/start_at strings repeat a lot across polls of the same calendar; parsed
+# datetimes are immutable, so results are shared.
+DATETIME_PARSE_CACHE_SIZE = 4096
+
+
 def _parse_event_datetime(value: Any, default_tz: ZoneInfo) -> Optional[datetime]:
     if isinstance(value, (int, float)):
         try:
@@ -89,7 +301,11 @@ def _parse_event_datetime(value: Any, default_tz: ZoneInfo) -> Optional[datetime
     raw = value.strip()
     if not raw:
         return None
+    return _parse_event_datetime_str(raw, default_tz)
+
 
+@lru_cache(maxsize=DATETIME_PARSE_CACHE_SIZE)
+def _parse_event_datetime_str(raw: str, default_tz: ZoneInfo) -> Optional[datetime]:
     # Support common ISO forms, including a trailing Z.
     try:
         dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
@@ -100,10 +316,7 @@ def _parse_event_datetime(value: Any, default_tz: ZoneInfo) -> Optional[datetime
         pass
 
     # Support "DD.MM.YYYY HH:MM" as a practical fallback.
-    m = re.match(
-        r"^\s*(\d{1,2})\.(\d{1,2})\.(\d{4})\s+(\d{1,2}):(\d{2})\s*$",
-        raw,
-    )
+    m = EVENT_DOT_DATE_RE.match(raw)
     if not m:
         return None
     day, month, year, hour, minute = [int(x) for x in m.groups()]
@@ -150,30 +363,47 @@ def _normalized_event_rows(payload: Any, default_tz: ZoneInfo) -> List[dict[str,
     return normalized
 
 
-def _unfold_ics_lines(text: str) -> list[str]:
-    """Join folded iCalendar lines (RFC 5545)."""
-    unfolded: list[str] = []
-    for raw in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
-        if (raw.startswith(" ") or raw.startswith("\t")) and unfolded:
-            unfolded[-1] += raw[1:]
-        else:
-            unfolded.append(raw)
-    return unfolded
+def _iter_unfolded_ics_lines(text: str) -> Iterator[str]:
+    """Yield iCalendar lines with folded continuations joined (RFC 5545)."""
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    parts: list[str] = []
+    pos, end = 0, len(text)
+    while pos <= end:
+        nl = text.find("\n", pos)
+        if nl < 0:
+            nl = end
+        raw = text[pos:nl]
+        pos = nl + 1
+        if parts and raw[:1] in (" ", "\t"):
+            parts.append(raw[1:])
+            continue
+        if parts:
+            yield "".join(parts)
+        parts = [raw]
+    if parts:
+        yield "".join(parts)
 
 
 def _ics_parse_key_params_and_value(line: str) -> tuple[str, dict[str, str], str]:
-    if ":" not in line:
+    # Index scan over the head; avoids building split() lists for every line.
+    colon = line.find(":")
+    if colon < 0:
         return "", {}, ""
-    head, value = line.split(":", 1)
-    chunks = head.split(";")
-    key = chunks[0].strip().upper()
+    value = line[colon + 1 :].strip()
+    semi = line.find(";", 0, colon)
+    if semi < 0:
+        return line[:colon].strip().upper(), {}, value
+    key = line[:semi].strip().upper()
     params: dict[str, str] = {}
-    for chunk in chunks[1:]:
-        if "=" not in chunk:
-            continue
-        p_key, p_val = chunk.split("=", 1)
-        params[p_key.strip().upper()] = p_val.strip()
-    return key, params, value.strip()
+    while semi >= 0:
+        start = semi + 1
+        semi = line.find(";", start, colon)
+        stop = colon if semi < 0 else semi
+        eq = line.find("=", start, stop)
+        if eq >= 0:
+            params[line[start:eq].strip().upper()] = line[eq + 1 : stop].strip()
+    return key, params, value
 
 
 def _ics_unescape_text(value: str) -> str:
@@ -188,27 +418,51 @@ def _ics_unescape_text(value: str) -> str:
 
 
 def _extract_first_url(text: str) -> Optional[str]:
-    m = re.search(r"https?://[^\s<>()]+", text or "")
+    m = URL_RE.search(text or "")
     if not m:
         return None
     return m.group(0).rstrip(".,);")
 
 
+def _ics_datetime_fields(raw: str) -> Optional[Tuple[int, ...]]:
+    """Split fixed-width YYYYMMDD or YYYYMMDDTHHMM[SS] into ints; None for anything else."""
+    n = len(raw)
+    if n not in (8, 13, 15) or not raw.isascii():
+        return None
+    if n == 8:
+        return (int(raw[0:4]), int(raw[4:6]), int(raw[6:8])) if raw.isdigit() else None
+    if raw[8] != "T" or not raw[:8].isdigit() or not raw[9:].isdigit():
+        return None
+    second = int(raw[13:15]) if n == 15 else 0
+    return int(raw[0:4]), int(raw[4:6]), int(raw[6:8]), int(raw[9:11]), int(raw[11:13]), second
+
+
 def _parse_ics_datetime(value: str, params: dict[str, str], default_tz: ZoneInfo) -> Optional[datetime]:
     raw = (value or "").strip()
     if not raw:
         return None
+    tzid = (params.get("TZID") or "").strip()
+    value_kind = (params.get("VALUE") or "").strip().upper()
+    return _parse_ics_datetime_cached(raw, tzid, value_kind, default_tz)
+
 
+@lru_cache(maxsize=DATETIME_PARSE_CACHE_SIZE)
+def _parse_ics_datetime_cached(
+    raw: str, tzid: str, value_kind: str, default_tz: ZoneInfo
+) -> Optional[datetime]:
     tz: ZoneInfo = default_tz
-    tzid = (params.get("TZID") or "").strip()
     if tzid:
-        try:
-            tz = ZoneInfo(tzid)
-        except Exception:
-            tz = default_tz
+        tz = _zoneinfo_or_none(tzid) or default_tz
 
+    # Fixed-width values are sliced directly; strptime stays as the fallback for the rest.
     # UTC format, e.g. 20260210T163000Z
     if raw.endswith("Z"):
+        fields = _ics_datetime_fields(raw[:-1])
+        if fields is not None and len(fields) == 6:
+            try:
+                return datetime(*fields, tzinfo=timezone.utc)
+            except ValueError:
+                pass
         for fmt in ("%Y%m%dT%H%M%SZ", "%Y%m%dT%H%MZ"):
             try:
                 dt = datetime.strptime(raw, fmt).replace(tzinfo=timezone.utc)
@@ -216,14 +470,24 @@ def _parse_ics_datetime(value: str, params: dict[str, str], default_tz: ZoneInfo
             except Exception:
                 continue
 
-    value_kind = (params.get("VALUE") or "").strip().upper()
+    fields = _ics_datetime_fields(raw)
     if value_kind == "DATE" or ("T" not in raw and len(raw) == 8):
+        if fields is not None and len(fields) == 3:
+            try:
+                return datetime(*fields, tzinfo=tz).astimezone(timezone.utc)
+            except ValueError:
+                pass
         try:
             dt_local = datetime.strptime(raw, "%Y%m%d").replace(tzinfo=tz)
             return dt_local.astimezone(timezone.utc)
         except Exception:
             return None
 
+    if fields is not None and len(fields) == 6:
+        try:
+            return datetime(*fields, tzinfo=tz).astimezone(timezone.utc)
+        except ValueError:
+            pass
     for fmt in ("%Y%m%dT%H%M%S", "%Y%m%dT%H%M"):
         try:
             dt_local = datetime.strptime(raw, fmt).replace(tzinfo=tz)
@@ -239,12 +503,14 @@ def _normalized_ics_event_rows(
     fallback_link: Optional[str] = None,
 ) -> List[dict[str, Any]]:
     text = content.decode("utf-8-sig", errors="replace")
-    lines = _unfold_ics_lines(text)
 
     normalized: list[dict[str, Any]] = []
     event: Optional[dict[str, Any]] = None
-    for line in lines:
-        upper = line.strip().upper()
+    for line in _iter_unfolded_ics_lines(text):
+        # Only BEGIN:VEVENT / END:VEVENT need the upper-cased copy; long DESCRIPTION
+        # lines skip it (strip() returns the same object when there is nothing to strip).
+        stripped = line.strip()
+        upper = stripped.upper() if len(stripped) in (10, 12) else ""
         if upper == "BEGIN:VEVENT":
             event = {}
             continue
@@ -309,20 +575,231 @@ def _normalized_ics_event_rows(
     return normalized
 
 
-async def fetch_feed_http(feed: Feed) -> Tuple[int, Optional[str], Optional[str], Optional[bytes]]:
+# Upper bound on simultaneous feed downloads across all pollers.
+FEED_HTTP_CONCURRENCY = 20
+# Feed bodies are streamed in chunks and dropped past this size, so one
+# oversized response cannot balloon memory during concurrent backfill.
+FEED_READ_CHUNK_BYTES = 64 * 1024
+FEED_MAX_BYTES = 5 * 1024 * 1024
+_FEED_HTTP_SESSION: Optional[aiohttp.ClientSession] = None
+_FEED_HTTP_SESSION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_feed_http_session() -> aiohttp.ClientSession:
+    """Return the shared HTTP session used for feed polling (keep-alive, DNS cache)."""
+    global _FEED_HTTP_SESSION, _FEED_HTTP_SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    stale = _FEED_HTTP_SESSION
+    if stale is not None and not stale.closed and _FEED_HTTP_SESSION_LOOP is not loop:
+        # Left over from a finished event loop; its sockets died with that loop.
+        try:
+            await stale.close()
+        except RuntimeError:
+            pass
+    if (
+        _FEED_HTTP_SESSION is None
+        or _FEED_HTTP_SESSION.closed
+        or _FEED_HTTP_SESSION_LOOP is not loop
+    ):
+        _FEED_HTTP_SESSION = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=20),
+            connector=aiohttp.TCPConnector(
+                limit=FEED_HTTP_CONCURRENCY, ttl_dns_cache=300, keepalive_timeout=60
+            ),
+        )
+        _FEED_HTTP_SESSION_LOOP = loop
+    return _FEED_HTTP_SESSION
+
+
+async def close_feed_http_session() -> None:
+    global _FEED_HTTP_SESSION, _FEED_HTTP_SESSION_LOOP
+    if _FEED_HTTP_SESSION is not None and not _FEED_HTTP_SESSION.closed:
+        await _FEED_HTTP_SESSION.close()
+    _FEED_HTTP_SESSION = None
+    _FEED_HTTP_SESSION_LOOP = None
+
+
+@dataclass(frozen=True)
+class FeedSnapshot:
+    """Poll-relevant feed columns, read before the HTTP request so no session is held."""
+
+    id: int
+    url: str
+    type: Optional[str]
+    http_etag: Optional[str]
+    http_last_modified: Optional[str]
+    http_body_hash: Optional[str]
+
+
+def _load_feed_snapshot(feed_id: int) -> Optional[FeedSnapshot]:
+    with session_scope() as s:
+        row = s.execute(
+            select(
+                Feed.id,
+                Feed.url,
+                Feed.type,
+                Feed.http_etag,
+                Feed.http_last_modified,
+                Feed.http_body_hash,
+            ).where(Feed.id == feed_id, Feed.enabled.is_(True))
+        ).first()
+    return FeedSnapshot(*row) if row else None
+
+
+def _feed_title(parsed: Any) -> Optional[str]:
+    try:
+        feed_meta = parsed.get("feed")
+        return feed_meta.get("title") if isinstance(feed_meta, dict) else None
+    except Exception:
+        return None
+
+
+def _touch_feed(
+    s: Session,
+    feed_id: int,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    name: Optional[str] = None,
+    body_hash: Optional[str] = None,
+) -> bool:
+    """Record a poll with one UPDATE; validators and name are only overwritten when present.
+
+    Returns False if the feed no longer exists.
+    """
+    values: dict[str, Any] = {"last_poll_at": datetime.now(timezone.utc)}
+    if etag:
+        values["http_etag"] = etag
+    if last_modified:
+        values["http_last_modified"] = last_modified
+    if name:
+        values["name"] = name
+    if body_hash:
+        values["http_body_hash"] = body_hash
+    return s.execute(update(Feed).where(Feed.id == feed_id).values(**values)).rowcount > 0
+
+
+def _body_hash(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+async def fetch_feed_http(
+    feed: FeedSnapshot,
+) -> Tuple[int, Optional[str], Optional[str], Optional[bytes]]:
     headers = {}
     if feed.http_etag:
         headers["If-None-Match"] = feed.http_etag
     if feed.http_last_modified:
         headers["If-Modified-Since"] = feed.http_last_modified
 
-    timeout = aiohttp.ClientTimeout(total=20)
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        async with session.get(feed.url, headers=headers) as resp:
-            if resp.status == 304:
-                return 304, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), None
-            content = await resp.read()
-            return resp.status, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), content
+    session = await get_feed_http_session()
+    async with session.get(feed.url, headers=headers) as resp:
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        # 304s and error pages are never parsed, so their bodies are not downloaded
+        if resp.status != 200:
+            return resp.status, etag, last_modified, None
+        # An oversized body is dropped without its validators: storing them would turn
+        # the next poll into a 304 and the body would never be processed.
+        if resp.content_length is not None and resp.content_length > FEED_MAX_BYTES:
+            return resp.status, None, None, None
+        body = bytearray()
+        async for chunk in resp.content.iter_chunked(FEED_READ_CHUNK_BYTES):
+            body += chunk
+            if len(body) > FEED_MAX_BYTES:
+                return resp.status, None, None, None
+        return resp.status, etag, last_modified, bytes(body)
+
+
+def _event_rows_from_payload(
+    content: bytes, feed_type: str, fallback_link: str
+) -> list[dict[str, Any]]:
+    default_tz = _default_tz()
+    if feed_type == "event_ics":
+        return _normalized_ics_event_rows(content, default_tz, fallback_link=fallback_link)
+    try:
+        # orjson reads the bytes directly, without a decoded str copy
+        if orjson is not None:
+            payload = orjson.loads(content)
+        else:
+            payload = json.loads(content.decode("utf-8"))
+    except Exception:
+        return []
+    return _normalized_event_rows(payload, default_tz)
+
+
+def _store_events(
+    s: Session,
+    feed_id: int,
+    events: List[dict[str, Any]],
+    fingerprint_fallback: bool,
+) -> List[int]:
+    """Upsert normalised event rows; returns the ids of newly created items.
+
+    Existing items are loaded with one IN query on external_id (and, for ICS, one on
+    the event fingerprint) instead of a lookup per event; new ones are written with one
+    INSERT ... ON CONFLICT DO NOTHING.
+    """
+    if not events:
+        return []
+    hashes = [event_identity_hash(e["title"], e["published_at"]) for e in events]
+    by_external_id: dict[str, Union[Item, dict[str, Any]]] = {
+        it.external_id: it
+        for it in s.scalars(
+            select(Item).where(
+                Item.feed_id == feed_id,
+                Item.external_id.in_({e["external_id"] for e in events}),
+            )
+        )
+    }
+    # Some ICS providers mutate UID between polls for the same event.
+    # Fall back to a stable event fingerprint to avoid duplicate items.
+    by_hash: dict[str, Union[Item, dict[str, Any]]] = {}
+    if fingerprint_fallback:
+        for it in s.scalars(
+            select(Item)
+            .where(Item.feed_id == feed_id, Item.summary_hash.in_(set(hashes)))
+            .order_by(Item.id)
+        ):
+            by_hash.setdefault(it.summary_hash, it)
+
+    # Rows created earlier in this poll are plain dicts until the bulk INSERT below
+    new_rows: list[dict[str, Any]] = []
+    for event, event_summary_hash in zip(events, hashes):
+        values = {
+            "title": event["title"],
+            "link": event["link"],
+            "published_at": event["published_at"],
+            "summary_hash": event_summary_hash,
+        }
+        existing: Union[Item, dict[str, Any], None] = by_external_id.get(event["external_id"])
+        if existing is None and fingerprint_fallback:
+            existing = by_hash.get(event_summary_hash)
+        if isinstance(existing, dict):
+            # Repeats within the same payload update the pending row
+            existing.update(values)
+        elif existing is not None:
+            for key, value in values.items():
+                setattr(existing, key, value)
+        else:
+            existing = {
+                "feed_id": feed_id,
+                "external_id": event["external_id"],
+                "categories": ["event_start"],
+                **values,
+            }
+            new_rows.append(existing)
+            by_external_id[event["external_id"]] = existing
+        by_hash.setdefault(event_summary_hash, existing)
+    if not new_rows:
+        return []
+    # A concurrent poll (e.g. the first poll from /addevents) may have inserted some
+    # of these since the lookup; let the unique constraint skip them.
+    stmt = (
+        sqlite_insert(Item)
+        .on_conflict_do_nothing(index_elements=[Item.feed_id, Item.external_id])
+        .returning(Item.external_id, Item.id)
+    )
+    created = {ext_id: item_id for ext_id, item_id in s.execute(stmt, new_rows)}
+    return [created[row["external_id"]] for row in new_rows if row["external_id"] in created]
 
 
 async def fetch_and_store_event_source(feed_id: int) -> List[int]:
@@ -335,142 +812,63 @@ async def fetch_and_store_event_source(feed_id: int) -> List[int]:
 
     For `feed.type=event_ics`, expected payload is a standard iCalendar (.ics).
     """
-    with session_scope() as s:
-        feed = s.get(Feed, feed_id)
-        if not feed or not feed.enabled:
-            return []
-        feed_type = (feed.type or "").strip().lower()
+    feed = _load_feed_snapshot(feed_id)
+    if feed is None:
+        return []
+    feed_type = (feed.type or "").strip().lower()
 
     status, etag, last_modified, content = await fetch_feed_http(feed)
+    events: list[dict[str, Any]] = []
+    body_hash: Optional[str] = None
+    if status == 200 and content:
+        body_hash = _body_hash(content)
+        # An unchanged calendar would only re-apply the same upserts
+        if body_hash != feed.http_body_hash:
+            events = await asyncio.to_thread(_event_rows_from_payload, content, feed_type, feed.url)
+
+    # Poll metadata and event upserts share one transaction
     with session_scope() as s:
-        f = s.get(Feed, feed_id)
-        f.http_etag = etag or f.http_etag
-        f.http_last_modified = last_modified or f.http_last_modified
-        f.last_poll_at = datetime.now(timezone.utc)
-    if status == 304 or not content:
-        return []
-    if status != 200:
-        return []
-
-    settings = Settings()
-    default_tz = ZoneInfo(settings.TZ or "UTC")
-    events: list[dict[str, Any]]
-    if feed_type == "event_ics":
-        events = _normalized_ics_event_rows(content, default_tz, fallback_link=feed.url)
-    else:
-        try:
-            payload = json.loads(content.decode("utf-8"))
-        except Exception:
+        if not _touch_feed(s, feed_id, etag, last_modified, body_hash=body_hash):
             return []
-        events = _normalized_event_rows(payload, default_tz)
-    if not events:
-        return []
-
-    created_ids: list[int] = []
-    with session_scope() as s:
-        f = s.get(Feed, feed_id)
-        for event in events:
-            event_summary_hash = event_identity_hash(event["title"], event["published_at"])
-            existing = (
-                s.query(Item)
-                .filter(Item.feed_id == f.id, Item.external_id == event["external_id"])
-                .first()
-            )
-            # Some ICS providers mutate UID between polls for the same event.
-            # Fall back to a stable event fingerprint to avoid duplicate items.
-            if not existing and feed_type == "event_ics":
-                existing = (
-                    s.query(Item)
-                    .filter(Item.feed_id == f.id, Item.summary_hash == event_summary_hash)
-                    .first()
-                )
-            if existing:
-                existing.title = event["title"]
-                existing.link = event["link"]
-                existing.published_at = event["published_at"]
-                existing.summary_hash = event_summary_hash
-                continue
-            it = Item(
-                feed_id=f.id,
-                external_id=event["external_id"],
-                title=event["title"],
-                link=event["link"],
-                published_at=event["published_at"],
-                categories=["event_start"],
-                summary_hash=event_summary_hash,
-            )
-            s.add(it)
-            s.flush()
-            created_ids.append(it.id)
-    return created_ids
+        return _store_events(s, feed_id, events, fingerprint_fallback=feed_type == "event_ics")
 
 
 async def fetch_and_store_feed(feed_id: int) -> List[int]:
     """Fetches a feed by id, stores new items, returns list of new Item IDs."""
-    from .db import Feed as FeedModel  # avoid circular import
-
-    with session_scope() as s:
-        feed: Optional[FeedModel] = s.get(FeedModel, feed_id)
-        if not feed or not feed.enabled:
-            return []
+    feed = _load_feed_snapshot(feed_id)
+    if feed is None:
+        return []
 
     status, etag, last_modified, content = await fetch_feed_http(feed)
 
-    new_ids: List[int] = []
     if status == 304:
         # no changes
         with session_scope() as s:
-            f = s.get(Feed, feed_id)
-            f.http_etag = etag or f.http_etag
-            f.http_last_modified = last_modified or f.http_last_modified
-            f.last_poll_at = datetime.now(timezone.utc)
+            _touch_feed(s, feed_id, etag, last_modified)
         return []
 
     if status != 200 or not content:
         with session_scope() as s:
-            f = s.get(Feed, feed_id)
-            f.last_poll_at = datetime.now(timezone.utc)
+            _touch_feed(s, feed_id)
         return []
 
-    parsed = feedparser.parse(content)
+    # Some servers answer 200 with an unchanged body instead of 304
+    body_hash = _body_hash(content)
+    if body_hash == feed.http_body_hash:
+        with session_scope() as s:
+            _touch_feed(s, feed_id, etag, last_modified)
+        return []
+
+    parsed = await asyncio.to_thread(parse_feed, content)
     entries = parsed.get("entries", [])
 
     with session_scope() as s:
-        f = s.get(Feed, feed_id)
-        f.http_etag = etag or f.http_etag
-        f.http_last_modified = last_modified or f.http_last_modified
-        f.last_poll_at = datetime.now(timezone.utc)
         # Update feed name from parsed metadata if available
-        try:
-            feed_meta = parsed.get("feed")
-            feed_title = feed_meta.get("title") if isinstance(feed_meta, dict) else None
-            if feed_title:
-                f.name = feed_title
-        except Exception:
-            pass
-
-        for e in entries:
-            vid = _extract_video_id(e) or (e.get("id") or "").strip()
-            if not vid:
-                continue
-            exists = (
-                s.query(Item.id).filter(Item.feed_id == f.id, Item.external_id == vid).first()
-            )
-            if exists:
-                continue
-            it = Item(
-                feed_id=f.id,
-                external_id=vid,
-                title=e.get("title"),
-                link=e.get("link"),
-                author=(e.get("author") or (e.get("author_detail") or {}).get("name")),
-                published_at=_published_at(e),
-                categories=[t.get("term") if isinstance(t, dict) else t for t in (e.get("tags") or [])],
-                summary_hash=_summary_hash(e),
-            )
-            s.add(it)
-            s.flush()
-            new_ids.append(it.id)
+        if not _touch_feed(
+            s, feed_id, etag, last_modified, name=_feed_title(parsed), body_hash=body_hash
+        ):
+            return []
+        new_ids = _store_new_entries(s, feed_id, entries)
 
     return new_ids
 
@@ -480,79 +878,36 @@ async def fetch_and_store_latest_item(feed_id: int) -> Optional[int]:
 
     Returns created Item ID or None if nothing stored.
     """
-    with session_scope() as s:
-        feed = s.get(Feed, feed_id)
-        if not feed or not feed.enabled:
-            return None
+    feed = _load_feed_snapshot(feed_id)
+    if feed is None:
+        return None
 
     status, etag, last_modified, content = await fetch_feed_http(feed)
     if status == 304 or not content:
         with session_scope() as s:
-            f = s.get(Feed, feed_id)
-            f.http_etag = etag or f.http_etag
-            f.http_last_modified = last_modified or f.http_last_modified
-            f.last_poll_at = datetime.now(timezone.utc)
+            _touch_feed(s, feed_id, etag, last_modified)
         return None
 
-    parsed = feedparser.parse(content)
+    parsed = await asyncio.to_thread(parse_feed, content)
     entries = parsed.get("entries", [])
     if not entries:
         with session_scope() as s:
-            f = s.get(Feed, feed_id)
-            f.http_etag = etag or f.http_etag
-            f.http_last_modified = last_modified or f.http_last_modified
-            f.last_poll_at = datetime.now(timezone.utc)
+            _touch_feed(s, feed_id, etag, last_modified)
         return None
 
     # Select entry with max published/updated time; fallback to first
-    def entry_dt(e: feedparser.FeedParserDict) -> datetime:
-        dt = _published_at(e)
-        return dt or datetime.fromtimestamp(0, tz=timezone.utc)
-
-    latest = max(entries, key=entry_dt)
-    vid = _extract_video_id(latest) or (latest.get("id") or "").strip()
-    if not vid:
+    latest_dt, latest = max(_dated_entries(entries), key=_entry_sort_key)
+    if not _entry_external_id(latest):
         # can't identify id; still update headers
         with session_scope() as s:
-            f = s.get(Feed, feed_id)
-            f.http_etag = etag or f.http_etag
-            f.http_last_modified = last_modified or f.http_last_modified
-            f.last_poll_at = datetime.now(timezone.utc)
+            _touch_feed(s, feed_id, etag, last_modified)
         return None
 
     with session_scope() as s:
-        f = s.get(Feed, feed_id)
-        f.http_etag = etag or f.http_etag
-        f.http_last_modified = last_modified or f.http_last_modified
-        f.last_poll_at = datetime.now(timezone.utc)
-        try:
-            feed_meta = parsed.get("feed")
-            feed_title = feed_meta.get("title") if isinstance(feed_meta, dict) else None
-            if feed_title:
-                f.name = feed_title
-        except Exception:
-            pass
-
-        exists = (
-            s.query(Item.id).filter(Item.feed_id == f.id, Item.external_id == vid).first()
-        )
-        if exists:
+        if not _touch_feed(s, feed_id, etag, last_modified, name=_feed_title(parsed)):
             return None
-        it = Item(
-            feed_id=f.id,
-            external_id=vid,
-            title=latest.get("title"),
-            link=latest.get("link"),
-            author=(latest.get("author") or (latest.get("author_detail") or {}).get("name")),
-            published_at=_published_at(latest),
-            categories=[
-                t.get("term") if isinstance(t, dict) else t for t in (latest.get("tags") or [])
-            ],
-            summary_hash=_summary_hash(latest),
-        )
-        s.add(it)
-        s.flush()
-        return it.id
+        created = _store_new_entries(s, feed_id, [latest], published=[latest_dt])
+        return created[0] if created else None
 
 
 async def fetch_and_store_recent(feed_id: int, limit: int) -> List[int]:
@@ -560,65 +915,45 @@ async def fetch_and_store_recent(feed_id: int, limit: int) -> List[int]:
 
     This updates ETag/Last-Modified and last_poll_at like the normal fetch.
     """
-    with session_scope() as s:
-        feed = s.get(Feed, feed_id)
-        if not feed or not feed.enabled:
-            return []
+    feed = _load_feed_snapshot(feed_id)
+    if feed is None:
+        return []
 
     status, etag, last_modified, content = await fetch_feed_http(feed)
-    new_ids: List[int] = []
-    # Even on 304 update timestamps
+    entries: list[feedparser.FeedParserDict] = []
+    if status != 304 and content:
+        entries = (await asyncio.to_thread(parse_feed, content)).get("entries", [])
+
+    # Order entries by published desc (fallback to input order)
+    # (entry_published_at always returns UTC-aware values, so the keys are comparable)
+    dated = sorted(_dated_entries(entries), key=_entry_sort_key, reverse=True)
+
+    # Even on 304 update timestamps; metadata and items share one transaction
     with session_scope() as s:
-        f = s.get(Feed, feed_id)
-        f.http_etag = etag or f.http_etag
-        f.http_last_modified = last_modified or f.http_last_modified
-        f.last_poll_at = datetime.now(timezone.utc)
-    if status == 304 or not content:
-        return []
+        if not _touch_feed(s, feed_id, etag, last_modified):
+            return []
+        return _store_new_entries(
+            s, feed_id, [e for _, e in dated], limit=limit, published=[dt for dt, _ in dated]
+        )
 
-    parsed = feedparser.parse(content)
-    entries = parsed.get("entries", [])
 
-    # Order entries by published desc (fallback to input order)
-    def entry_dt(e: feedparser.FeedParserDict) -> datetime:
-        dt = _published_at(e)
-        return dt or datetime.fromtimestamp(0, tz=timezone.utc)
+async def fetch_and_store_many(
+    feed_ids: Iterable[int],
+    fetch: Callable[[int], Awaitable[List[int]]] = fetch_and_store_feed,
+    concurrency: int = FEED_HTTP_CONCURRENCY,
+) -> List[Union[List[int], BaseException]]:
+    """Run `fetch` for every feed with at most `concurrency` requests in flight.
 
-    try:
-        entries_sorted = sorted(entries, key=entry_dt, reverse=True)
-    except Exception:
-        entries_sorted = entries
+    Results come back in `feed_ids` order; a failing feed yields its exception
+    instead of cancelling the others.
+    """
+    sem = asyncio.Semaphore(concurrency)
 
-    count = 0
-    with session_scope() as s:
-        f = s.get(Feed, feed_id)
-        for e in entries_sorted:
-            if count >= max(0, limit):
-                break
-            vid = _extract_video_id(e) or (e.get("id") or "").strip()
-            if not vid:
-                continue
-            exists = (
-                s.query(Item.id).filter(Item.feed_id == f.id, Item.external_id == vid).first()
-            )
-            if exists:
-                continue
-            it = Item(
-                feed_id=f.id,
-                external_id=vid,
-                title=e.get("title"),
-                link=e.get("link"),
-                author=(e.get("author") or (e.get("author_detail") or {}).get("name")),
-                published_at=_published_at(e),
-                categories=[t.get("term") if isinstance(t, dict) else t for t in (e.get("tags") or [])],
-                summary_hash=_summary_hash(e),
-            )
-            s.add(it)
-            s.flush()
-            new_ids.append(it.id)
-            count += 1
+    async def _run(feed_id: int) -> List[int]:
+        async with sem:
+            return await fetch(feed_id)
 
-    return new_ids
+    return await asyncio.gather(*(_run(fid) for fid in feed_ids), return_exceptions=True)
 
 
 def compute_available_at(title: str, published_at: Optional[datetime]) -> Optional[datetime]:
@@ -630,9 +965,6 @@ def compute_available_at(title: str, published_at: Optional[datetime]) -> Option
       assume current year.
     - Otherwise, fall back to RSS `published_at`.
     """
-    settings = Settings()
-    tz = ZoneInfo(settings.TZ or "UTC")
-    now = datetime.now(tz)
     published_utc: Optional[datetime] = None
     if published_at is not None:
         if published_at.tzinfo is None:
@@ -640,8 +972,13 @@ def compute_available_at(title: str, published_at: Optional[datetime]) -> Option
         else:
             published_utc = published_at.astimezone(timezone.utc)
 
-    m = re.search(r"(\d{1,2})\.(\d{1,2})(?:\.(\d{2,4}))?(?:\D{1,3}(\d{1,2}):(\d{2}))?", title)
+    # Most titles carry no DD.MM date at all; skip the regex scan for them.
+    if "." not in title:
+        return published_utc
+    m = AVAILABILITY_DATE_RE.search(title)
     if m:
+        tz = _default_tz()
+        now = datetime.now(tz)
         day = int(m.group(1))
         month = int(m.group(2))
         year_str = m.group(3)
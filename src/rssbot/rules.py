@@ -1,10 +1,21 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from typing import Iterable, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, FrozenSet, Iterable, Optional, Pattern, Tuple
 
-from .db import FeedRule
+from sqlalchemy import func, not_, or_
+
+from .db import FeedRule, Item
+
+try:
+    import ahocorasick  # type: ignore
+except ImportError:  # optional speedup
+    ahocorasick = None
+
+# Below this many keywords a few `in` checks beat building and walking an automaton.
+AUTOMATON_MIN_KEYWORDS = 8
 
 
 @dataclass
@@ -15,45 +26,136 @@ class Content:
     duration_sec: Optional[int] = None
 
 
+@dataclass(frozen=True)
+class CompiledRules:
+    """FeedRule JSON lists normalised once, shared by every item checked against them.
+
+    Keyword and regex tuples are None when the rule list is unset. Keywords are
+    already lower-cased and regexes compiled with IGNORECASE unless the rule is case
+    sensitive; invalid regexes are dropped. Long keyword lists also get an
+    Aho-Corasick automaton when pyahocorasick is installed.
+    """
+
+    include_keywords: Optional[Tuple[str, ...]]
+    exclude_keywords: Optional[Tuple[str, ...]]
+    include_regex: Optional[Tuple[Pattern[str], ...]]
+    exclude_regex: Optional[Tuple[Pattern[str], ...]]
+    categories: FrozenSet[str]
+    require_all: bool
+    case_sensitive: bool
+    min_duration_sec: Optional[int]
+    max_duration_sec: Optional[int]
+    include_automaton: Any = field(default=None, compare=False, repr=False)
+    exclude_automaton: Any = field(default=None, compare=False, repr=False)
+
+
 def _normalize(text: str, case_sensitive: bool) -> str:
     return text if case_sensitive else text.lower()
 
 
-def _any_keyword(text: str, keywords: Iterable[str], case_sensitive: bool) -> bool:
+def _keyword_tuple(keywords: Tuple[str, ...], case_sensitive: bool) -> Optional[Tuple[str, ...]]:
     if not keywords:
-        return False
-    base = _normalize(text, case_sensitive)
+        return None
+    return tuple(_normalize(kw, case_sensitive) for kw in keywords if kw)
+
+
+def _keyword_automaton(keywords: Optional[Tuple[str, ...]]) -> Any:
+    if ahocorasick is None or keywords is None or len(keywords) < AUTOMATON_MIN_KEYWORDS:
+        return None
+    automaton = ahocorasick.Automaton()
     for kw in keywords:
-        if not kw:
-            continue
-        needle = kw if case_sensitive else kw.lower()
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+@lru_cache(maxsize=2048)
+def _compiled_pattern(pattern: str, case_sensitive: bool) -> Optional[Pattern[str]]:
+    try:
+        return re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+    except re.error:
+        # invalid pattern -> ignore
+        return None
+
+
+def _regex_tuple(
+    patterns: Tuple[str, ...], case_sensitive: bool
+) -> Optional[Tuple[Pattern[str], ...]]:
+    if not patterns:
+        return None
+    compiled = (_compiled_pattern(pat, case_sensitive) for pat in patterns)
+    return tuple(pat for pat in compiled if pat is not None)
+
+
+@lru_cache(maxsize=1024)
+def _compile_rules(
+    include_keywords: Tuple[str, ...],
+    exclude_keywords: Tuple[str, ...],
+    include_regex: Tuple[str, ...],
+    exclude_regex: Tuple[str, ...],
+    categories: Tuple[str, ...],
+    require_all: bool,
+    case_sensitive: bool,
+    min_duration_sec: Optional[int],
+    max_duration_sec: Optional[int],
+) -> CompiledRules:
+    include = _keyword_tuple(include_keywords, case_sensitive)
+    exclude = _keyword_tuple(exclude_keywords, case_sensitive)
+    return CompiledRules(
+        include_keywords=include,
+        exclude_keywords=exclude,
+        include_regex=_regex_tuple(include_regex, case_sensitive),
+        exclude_regex=_regex_tuple(exclude_regex, case_sensitive),
+        categories=frozenset(c.lower() for c in categories),
+        require_all=require_all,
+        case_sensitive=case_sensitive,
+        min_duration_sec=min_duration_sec,
+        max_duration_sec=max_duration_sec,
+        include_automaton=_keyword_automaton(include),
+        exclude_automaton=_keyword_automaton(exclude),
+    )
+
+
+def compile_rules(rules: FeedRule) -> CompiledRules:
+    """Return the normalised form of a FeedRule; cached on the rule's values, so edits
+    made through /setfilter or the web UI produce a fresh entry automatically."""
+    return _compile_rules(
+        tuple(rules.include_keywords or ()),
+        tuple(rules.exclude_keywords or ()),
+        tuple(rules.include_regex or ()),
+        tuple(rules.exclude_regex or ()),
+        tuple(rules.categories or ()),
+        bool(rules.require_all),
+        bool(rules.case_sensitive),
+        rules.min_duration_sec,
+        rules.max_duration_sec,
+    )
+
+
+def _any_keyword(base: str, keywords: Tuple[str, ...], automaton: Any = None) -> bool:
+    if automaton is not None:
+        for _ in automaton.iter(base):
+            return True
+        return False
+    for needle in keywords:
         if needle in base:
             return True
     return False
 
 
-def _all_keywords(text: str, keywords: Iterable[str], case_sensitive: bool) -> bool:
-    if not keywords:
-        return True
-    base = _normalize(text, case_sensitive)
-    for kw in keywords:
-        if not kw:
-            continue
-        needle = kw if case_sensitive else kw.lower()
+def _all_keywords(base: str, keywords: Tuple[str, ...], automaton: Any = None) -> bool:
+    if automaton is not None:
+        return {kw for _, kw in automaton.iter(base)} >= set(keywords)
+    for needle in keywords:
         if needle not in base:
             return False
     return True
 
 
-def _any_regex(text: str, patterns: Iterable[str], case_sensitive: bool) -> bool:
-    flags = 0 if case_sensitive else re.IGNORECASE
-    for pat in patterns or []:
-        try:
-            if re.search(pat, text, flags=flags):
-                return True
-        except re.error:
-            # invalid pattern -> ignore
-            continue
+def _any_regex(text: str, patterns: Tuple[Pattern[str], ...]) -> bool:
+    for pat in patterns:
+        if pat.search(text):
+            return True
     return False
 
 
@@ -61,38 +163,82 @@ def matches_rules(content: Content, rules: Optional[FeedRule]) -> bool:
     # If no rules, allow all
     if rules is None:
         return True
+    compiled = compile_rules(rules)
 
-    text = (content.title or "") + "\n" + (content.description or "")
-    categories = [c.lower() for c in (content.categories or [])]
-
-    # Exclude checks first
-    if rules.exclude_keywords and _any_keyword(text, rules.exclude_keywords, rules.case_sensitive):
-        return False
-    if rules.exclude_regex and _any_regex(text, rules.exclude_regex, rules.case_sensitive):
-        return False
-
-    if rules.categories:
-        want = {c.lower() for c in rules.categories}
-        if not categories or not (set(categories) & want):
+    # Cheapest checks first: they need neither the joined text nor its lowered copy
+    if compiled.categories:
+        # Item categories are lowered lazily; isdisjoint stops at the first hit
+        if compiled.categories.isdisjoint(c.lower() for c in (content.categories or ())):
             # If categories filter set and no intersection -> reject
             return False
 
     # Duration checks
-    if content.duration_sec is not None:
-        if rules.min_duration_sec is not None and content.duration_sec < rules.min_duration_sec:
+    duration = content.duration_sec
+    if duration is not None:
+        if compiled.min_duration_sec is not None and duration < compiled.min_duration_sec:
             return False
-        if rules.max_duration_sec is not None and content.duration_sec > rules.max_duration_sec:
+        if compiled.max_duration_sec is not None and duration > compiled.max_duration_sec:
             return False
 
-    # Include checks: if include lists provided, must match
-    include_blocks = []
-    if rules.include_keywords:
-        if rules.require_all:
-            include_blocks.append(_all_keywords(text, rules.include_keywords, rules.case_sensitive))
+    needs_base = compiled.include_keywords is not None or compiled.exclude_keywords
+    if not needs_base and compiled.include_regex is None and not compiled.exclude_regex:
+        return True
+
+    # Title and description are joined (and lowered) once per item
+    text = (content.title or "") + "\n" + (content.description or "")
+    base = _normalize(text, compiled.case_sensitive) if needs_base else text
+
+    # Keywords before regexes; include lists provided must match
+    if compiled.exclude_keywords and _any_keyword(
+        base, compiled.exclude_keywords, compiled.exclude_automaton
+    ):
+        return False
+    if compiled.include_keywords is not None:
+        if compiled.require_all:
+            matched = _all_keywords(base, compiled.include_keywords, compiled.include_automaton)
         else:
-            include_blocks.append(_any_keyword(text, rules.include_keywords, rules.case_sensitive))
-    if rules.include_regex:
-        include_blocks.append(_any_regex(text, rules.include_regex, rules.case_sensitive))
+            matched = _any_keyword(base, compiled.include_keywords, compiled.include_automaton)
+        if not matched:
+            return False
+    if compiled.exclude_regex and _any_regex(text, compiled.exclude_regex):
+        return False
+    if compiled.include_regex is not None:
+        return _any_regex(text, compiled.include_regex)
+    return True
 
-    return all(include_blocks) if include_blocks else True
 
+def _title_contains(keyword: str, case_sensitive: bool):
+    title = func.coalesce(Item.title, "")
+    # SQLite's lower() only folds ASCII, so this may miss matches Python finds but
+    # never reports one Python would not.
+    return func.instr(title if case_sensitive else func.lower(title), keyword) > 0
+
+
+def rules_to_sql(rules: Optional[FeedRule]) -> list:
+    """WHERE clauses on Item that reject only items matches_rules would reject too.
+
+    Digest items carry just a title, so keyword rules reduce to substring checks on
+    it. Include keywords are pushed down only for case-sensitive rules and categories
+    not at all, as SQLite cannot lower non-ASCII text; matches_rules stays the final
+    check for everything.
+    """
+    if rules is None:
+        return []
+    compiled = compile_rules(rules)
+    clauses = []
+    no_duration = Item.duration_sec.is_(None)
+    if compiled.min_duration_sec is not None:
+        clauses.append(or_(no_duration, Item.duration_sec >= compiled.min_duration_sec))
+    if compiled.max_duration_sec is not None:
+        clauses.append(or_(no_duration, Item.duration_sec <= compiled.max_duration_sec))
+    # Keywords spanning the title/description separator only match in Python
+    for kw in compiled.exclude_keywords or ():
+        if "\n" not in kw:
+            clauses.append(not_(_title_contains(kw, compiled.case_sensitive)))
+    include = compiled.include_keywords
+    if include and compiled.case_sensitive:
+        if compiled.require_all:
+            clauses.extend(_title_contains(kw, True) for kw in include if "\n" not in kw)
+        elif not any("\n" in kw for kw in include):
+            clauses.append(or_(*(_title_contains(kw, True) for kw in include)))
+    return clauses
@@ -2,19 +2,26 @@ from __future__ import annotations
 
 import asyncio
 from dataclasses import dataclass
-from datetime import datetime, time, timezone
-from typing import Optional
+from datetime import datetime, time, timedelta, timezone
+from typing import Iterable, Optional
 from urllib.parse import urlparse
-from zoneinfo import ZoneInfo
 
 from aiogram import Bot
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import and_, exists, insert, or_, select, update
+from sqlalchemy.orm import joinedload
 
 from .db import Delivery, Feed, Item, User, session_scope, FeedBaseline
-from .rules import Content, matches_rules
-from .rss import compute_available_at, event_identity_hash, fetch_and_store_event_source, fetch_and_store_feed
-from .config import Settings
+from .rules import Content, matches_rules, rules_to_sql
+from .rss import (
+    compute_available_at,
+    event_identity_hash,
+    fetch_and_store_event_source,
+    fetch_and_store_feed,
+    get_zoneinfo,
+)
+from .config import get_settings
 
 
 @dataclass
@@ -40,6 +47,64 @@ def _is_youtube_link(link: str) -> bool:
 
 MARK_SEEN_CALLBACK_DATA = "msg:viewed"
 
+# Messages per digest and rows fetched per batch while collecting them.
+DIGEST_MAX_ITEMS = 20
+DIGEST_BATCH_SIZE = 50
+# Chats whose digests are sent at the same time; kept low so the bot stays well
+# under Telegram's global ~30 messages/second.
+DIGEST_CHAT_CONCURRENCY = 3
+# How late the digest scanner may still send a digest whose slot it missed.
+DIGEST_LATE_GRACE = timedelta(minutes=15)
+
+
+def _after_baseline_clauses(baseline: Optional[FeedBaseline]) -> list:
+    """SQL form of "published (or, undated, stored) after the feed's baseline".
+
+    SQLite stores these columns as UTC wall-clock strings, so they compare in SQL the
+    same way _to_utc_aware values compare in Python.
+    """
+    if baseline is None:
+        return []
+    clauses = []
+    # Exclude the baseline item itself
+    if baseline.baseline_item_external_id:
+        clauses.append(Item.external_id != baseline.baseline_item_external_id)
+    # Undated items (and legacy rows) fall back to a creation time cutoff
+    created_after = Item.created_at > baseline.baseline_set_at
+    if baseline.baseline_published_at is not None:
+        clauses.append(
+            or_(
+                and_(
+                    Item.published_at.isnot(None),
+                    Item.published_at > baseline.baseline_published_at,
+                ),
+                and_(Item.published_at.is_(None), created_after),
+            )
+        )
+    else:
+        clauses.append(created_after)
+    return clauses
+
+
+def _next_digest_at(
+    digest_time_local: Optional[str], tz_name: Optional[str], after: datetime
+) -> Optional[datetime]:
+    """First UTC instant after `after` at which the local clock reads digest_time_local."""
+    try:
+        hh, mm = [int(x) for x in (digest_time_local or "").split(":", 1)]
+        want = time(hour=hh, minute=mm)
+    except ValueError:
+        return None
+    tz = get_zoneinfo(tz_name or "UTC")
+    day = after.astimezone(tz).date()
+    # Two days ahead covers any UTC offset and DST shift
+    for offset in range(3):
+        local = datetime.combine(day + timedelta(days=offset), want, tzinfo=tz)
+        candidate = local.astimezone(timezone.utc)
+        if candidate > after:
+            return candidate
+    return None
+
 
 def _with_mark_seen_button(
     rows: list[list[InlineKeyboardButton]],
@@ -89,6 +154,14 @@ class BotScheduler:
         except Exception:
             pass
 
+    def unschedule_feed_polls(self, feed_ids: Iterable[int]) -> None:
+        remove_job = self.scheduler.remove_job
+        for feed_id in feed_ids:
+            try:
+                remove_job(f"poll:{feed_id}")
+            except Exception:
+                pass
+
     async def _poll_feed_job(self, feed_id: int) -> None:
         with session_scope() as s:
             feed = s.get(Feed, feed_id)
@@ -167,7 +240,7 @@ class BotScheduler:
                 duration_sec=item.duration_sec,
             )
             # Skip future items (scheduled/premieres) until available_at
-            settings = Settings()
+            settings = get_settings()
             if settings.HIDE_FUTURE_VIDEOS:
                 available_at = compute_available_at(item.title or "", item.published_at)
                 available_at = _to_utc_aware(available_at)
@@ -177,21 +250,22 @@ class BotScheduler:
                 return
 
             # Check deduplication
-            d = (
-                s.query(Delivery.id)
-                .filter(
+            d = s.scalar(
+                select(1)
+                .where(
                     Delivery.item_id == item.id,
                     Delivery.feed_id == feed.id,
                     Delivery.user_id == user.id,
                     Delivery.channel == "immediate",
                 )
-                .first()
+                .limit(1)
             )
             if d:
                 return
 
             # snapshot values
             chat_id = user.chat_id
+            user_id_v = user.id
             item_id_v = item.id
             feed_id_v = feed.id
             title = item.title or "(без названия)"
@@ -208,7 +282,7 @@ class BotScheduler:
                 Delivery(
                     item_id=item_id_v,
                     feed_id=feed_id_v,
-                    user_id=s.query(User.id).filter(User.chat_id == chat_id).scalar(),
+                    user_id=user_id_v,
                     channel="immediate",
                     status=status,
                     error_message=error,
@@ -293,15 +367,15 @@ class BotScheduler:
                 if event_key in delivered_event_keys:
                     continue
 
-                delivered = (
-                    s.query(Delivery.id)
-                    .filter(
+                delivered = s.scalar(
+                    select(1)
+                    .where(
                         Delivery.item_id == item.id,
                         Delivery.feed_id == feed.id,
                         Delivery.user_id == user.id,
                         Delivery.channel == "immediate",
                     )
-                    .first()
+                    .limit(1)
                 )
                 if delivered:
                     continue
@@ -341,105 +415,131 @@ class BotScheduler:
         return sent
 
     async def _digest_scan_tick(self) -> None:
-        # For each feed in digest mode, if it's time in user's tz and not sent today, send digest
+        # Only feeds whose stored fire time has passed (or was never computed) are loaded
+        now_utc = datetime.now(timezone.utc)
+        minute_start = now_utc.replace(second=0, microsecond=0)
         with session_scope() as s:
             rows = (
-                s.query(Feed, User)
+                s.query(
+                    Feed.id,
+                    Feed.user_id,
+                    Feed.digest_time_local,
+                    Feed.last_digest_at,
+                    Feed.next_digest_at_utc,
+                    User.tz,
+                )
                 .join(User, Feed.user_id == User.id)
-                .filter(Feed.enabled == True, Feed.mode == "digest")
+                .filter(
+                    Feed.enabled == True,
+                    Feed.mode == "digest",
+                    Feed.digest_time_local.isnot(None),
+                    or_(Feed.next_digest_at_utc.is_(None), Feed.next_digest_at_utc <= now_utc),
+                )
                 .all()
             )
 
-        now_utc = datetime.now(timezone.utc)
-        for feed, user in rows:
-            if not feed.digest_time_local:
-                continue
-            try:
-                hh, mm = [int(x) for x in feed.digest_time_local.split(":", 1)]
-            except Exception:
-                continue
-            tz = ZoneInfo(user.tz or "UTC")
-            now_local = now_utc.astimezone(tz)
-            want = time(hour=hh, minute=mm)
-            if now_local.hour != want.hour or now_local.minute != want.minute:
-                continue
-            # Check if already sent today
-            if feed.last_digest_at:
-                last_digest_at = _to_utc_aware(feed.last_digest_at)
-                if not last_digest_at:
+            due_by_user: dict[int, list[int]] = {}
+            next_fire: list[dict] = []
+            for feed_id, user_id, digest_time_local, last_digest_at, next_at, tz_name in rows:
+                # A fresh schedule still fires if its slot is this very minute
+                fire_at = _to_utc_aware(next_at) or _next_digest_at(
+                    digest_time_local, tz_name, minute_start - timedelta(microseconds=1)
+                )
+                following = _next_digest_at(digest_time_local, tz_name, now_utc)
+                if fire_at is None or following is None:
                     continue
-                last_local = last_digest_at.astimezone(tz)
-                if last_local.date() == now_local.date():
+                next_fire.append({"id": feed_id, "next_digest_at_utc": following})
+                # Slots missed by more than the grace period (bot down, feed muted) are skipped
+                if fire_at > now_utc or now_utc - fire_at > DIGEST_LATE_GRACE:
                     continue
-            await self._send_digest_for_feed(feed.id)
+                # Check if already sent today
+                if last_digest_at:
+                    tz = get_zoneinfo(tz_name or "UTC")
+                    last_local = _to_utc_aware(last_digest_at).astimezone(tz)
+                    if last_local.date() == fire_at.astimezone(tz).date():
+                        continue
+                due_by_user.setdefault(user_id, []).append(feed_id)
+            if next_fire:
+                s.execute(update(Feed), next_fire)
+
+        if not due_by_user:
+            return
+        # Chats are served concurrently; one chat's digests stay sequential so its
+        # messages keep their order and stay under Telegram's per-chat limit.
+        sem = asyncio.Semaphore(DIGEST_CHAT_CONCURRENCY)
+
+        async def _send_user_digests(feed_ids: list[int]) -> None:
+            async with sem:
+                for feed_id in feed_ids:
+                    await self._send_digest_for_feed(feed_id)
+
+        await asyncio.gather(*(_send_user_digests(ids) for ids in due_by_user.values()))
 
     async def _send_digest_for_feed(
         self, feed_id: int, *, update_last_digest_at: bool = True
     ) -> None:
         with session_scope() as s:
-            feed = s.get(Feed, feed_id)
-            if not feed:
+            # Feed, owner, rules and baseline in one round trip
+            row = s.execute(
+                select(Feed, FeedBaseline)
+                .outerjoin(FeedBaseline, FeedBaseline.feed_id == Feed.id)
+                .options(joinedload(Feed.user), joinedload(Feed.rules))
+                .where(Feed.id == feed_id)
+            ).first()
+            if row is None:
                 return
-            user = s.get(User, feed.user_id)
+            feed, baseline = row
+            user = feed.user
             rules = feed.rules
-            baseline = s.get(FeedBaseline, feed.id)
 
-            delivered_item_ids = {
-                r[0]
-                for r in s.query(Delivery.item_id)
-                .filter(Delivery.feed_id == feed.id, Delivery.user_id == user.id)
-                .all()
-            }
-            items = (
-                s.query(Item)
-                .filter(Item.feed_id == feed.id)
+            # Already delivered items (any channel), the baseline cut-off and the rules
+            # SQL can express are filtered in SQL; matches_rules and availability
+            # still run in Python.
+            stmt = (
+                select(Item)
+                .where(
+                    Item.feed_id == feed.id,
+                    ~exists().where(
+                        Delivery.item_id == Item.id,
+                        Delivery.feed_id == feed.id,
+                        Delivery.user_id == user.id,
+                    ),
+                    *_after_baseline_clauses(baseline),
+                    *rules_to_sql(rules),
+                )
                 .order_by(Item.published_at.desc().nullslast(), Item.id.desc())
-                .all()
+                .execution_options(yield_per=DIGEST_BATCH_SIZE)
             )
 
-            def after_baseline(it: Item) -> bool:
-                if not baseline:
-                    return True
-                # Exclude the baseline item itself
-                if baseline.baseline_item_external_id and it.external_id == baseline.baseline_item_external_id:
-                    return False
-                if baseline.baseline_published_at and it.published_at:
-                    left = _to_utc_aware(it.published_at)
-                    right = _to_utc_aware(baseline.baseline_published_at)
-                    if left and right:
-                        return left > right
-                # Fallback to creation time cutoff
-                ref = baseline.baseline_set_at
-                # created_at could be None for legacy rows
-                return (it.created_at or ref) > ref
-
             kept_info = []
-            settings = Settings()
+            settings = get_settings()
             now_utc = datetime.now(timezone.utc)
-            for it in items:
-                if it.id in delivered_item_ids:
-                    continue
-                content = Content(
-                    title=it.title or "",
-                    categories=it.categories,
-                    duration_sec=it.duration_sec,
-                )
-                if settings.HIDE_FUTURE_VIDEOS:
-                    available_at = compute_available_at(it.title or "", it.published_at)
-                    available_at = _to_utc_aware(available_at)
-                    if available_at and now_utc < available_at:
-                        continue
-                if after_baseline(it) and matches_rules(content, rules):
-                    kept_info.append(
-                        {
-                            "id": it.id,
-                            "title": it.title or "(без названия)",
-                            "link": it.link or "",
-                            "published_at": it.published_at,
-                        }
+            with s.scalars(stmt) as items:
+                for it in items:
+                    content = Content(
+                        title=it.title or "",
+                        categories=it.categories,
+                        duration_sec=it.duration_sec,
                     )
+                    if settings.HIDE_FUTURE_VIDEOS:
+                        available_at = compute_available_at(it.title or "", it.published_at)
+                        available_at = _to_utc_aware(available_at)
+                        if available_at and now_utc < available_at:
+                            continue
+                    if matches_rules(content, rules):
+                        kept_info.append(
+                            {
+                                "id": it.id,
+                                "title": it.title or "(без названия)",
+                                "link": it.link or "",
+                                "published_at": it.published_at,
+                            }
+                        )
+                        if len(kept_info) >= DIGEST_MAX_ITEMS:
+                            break
 
             chat_id = user.chat_id
+            user_id_v = user.id
             feed_id_v = feed.id
             feed_name = (feed.label or feed.name or "").strip()
 
@@ -451,7 +551,6 @@ class BotScheduler:
                         f.last_digest_at = datetime.now(timezone.utc)
             return
 
-        kept_info = kept_info[:20]
         send_results = []
         for info in kept_info:
             status, error = await self._send_video_message(
@@ -468,20 +567,22 @@ class BotScheduler:
 
         now = datetime.now(timezone.utc)
         with session_scope() as s:
-            # find user id for chat_id
-            user_id_v = s.query(User.id).filter(User.chat_id == chat_id).scalar()
-            for result in send_results:
-                s.add(
-                    Delivery(
-                        item_id=result["id"],
-                        feed_id=feed_id_v,
-                        user_id=user_id_v,
-                        channel="digest",
-                        status=result["status"],
-                        error_message=result["error"],
-                        sent_at=result["sent_at"],
-                    )
-                )
+            # One executemany INSERT instead of a unit-of-work entry per message
+            s.execute(
+                insert(Delivery),
+                [
+                    {
+                        "item_id": result["id"],
+                        "feed_id": feed_id_v,
+                        "user_id": user_id_v,
+                        "channel": "digest",
+                        "status": result["status"],
+                        "error_message": result["error"],
+                        "sent_at": result["sent_at"],
+                    }
+                    for result in send_results
+                ],
+            )
             if update_last_digest_at:
                 f = s.get(Feed, feed_id)
                 if f:
@@ -510,7 +611,7 @@ class BotScheduler:
                 duration_sec=item.duration_sec,
             )
             # Skip future items
-            settings = Settings()
+            settings = get_settings()
             if settings.HIDE_FUTURE_VIDEOS:
                 available_at = compute_available_at(item.title or "", item.published_at)
                 available_at = _to_utc_aware(available_at)
@@ -6,6 +6,7 @@ from typing import Optional
 from aiohttp import web
 from html import escape
 from datetime import datetime, timezone
+from sqlalchemy import select
 
 from .config import Settings
 from .db import Feed, Session, User, Item, Delivery, FeedBaseline, FeedRule, session_scope
@@ -22,6 +23,12 @@ class WebDeps:
 
 DEPS: Optional[WebDeps] = None
 
+# Feed preview on the settings page: rows scanned per feed, fetch batch size
+# and number of items shown.
+PREVIEW_SCAN_LIMIT = 50
+PREVIEW_BATCH_SIZE = 10
+PREVIEW_ITEMS = 10
+
 
 def set_deps(settings: Settings, scheduler: BotScheduler) -> None:
     global DEPS
@@ -154,40 +161,45 @@ async def user_page(request: web.Request) -> web.Response:
     """
 
     items_html: list[str] = []
+    hide_future = DEPS.settings.HIDE_FUTURE_VIDEOS
+    now_utc = datetime.now(timezone.utc)
     for f in feeds:
         safe_label = escape(f.label or "", quote=True)
         display_name = f.label or f.name or f.url
         safe_display = escape(display_name, quote=True)
+        preview_items: list[str] = []
         with session_scope() as s:
-            its = (
-                s.query(Item)
-                .filter(Item.feed_id == f.id)
+            rule = s.scalars(select(FeedRule).where(FeedRule.feed_id == f.id)).first()
+            # Stream the newest items in small batches and stop as soon as the
+            # preview is full instead of materialising the whole window.
+            with s.scalars(
+                select(Item)
+                .where(Item.feed_id == f.id)
                 .order_by(Item.published_at.desc().nullslast(), Item.id.desc())
-                .limit(50)
-                .all()
-            )
-            rule = s.query(FeedRule).filter(FeedRule.feed_id == f.id).first()
-        preview_items: list[str] = []
-        settings = Settings()
-        now_utc = datetime.now(timezone.utc)
-        for it in its:
-            # Apply future-availability filter if enabled
-            if settings.HIDE_FUTURE_VIDEOS:
-                available_at = compute_available_at(it.title or "", it.published_at)
-                if available_at and now_utc < available_at:
-                    continue
-            # Apply content rules
-            content = Content(title=it.title or "", categories=it.categories, duration_sec=it.duration_sec)
-            if not matches_rules(content, rule):
-                continue
-            t = escape(it.title or "(без названия)", quote=True)
-            link = escape(it.link or "", quote=True)
-            when = it.published_at.strftime("%Y-%m-%d") if it.published_at else ""
-            preview_items.append(
-                f"<li><a target=\"_blank\" rel=\"noopener\" href=\"{link}\">{t}</a> <small>{when}</small></li>"
-            )
-            if len(preview_items) >= 10:
-                break
+                .limit(PREVIEW_SCAN_LIMIT)
+                .execution_options(yield_per=PREVIEW_BATCH_SIZE)
+            ) as its:
+                for it in its:
+                    # Apply future-availability filter if enabled
+                    if hide_future:
+                        available_at = compute_available_at(it.title or "", it.published_at)
+                        if available_at and now_utc < available_at:
+                            continue
+                    # Apply content rules
+                    content = Content(
+                        title=it.title or "", categories=it.categories, duration_sec=it.duration_sec
+                    )
+                    if not matches_rules(content, rule):
+                        continue
+                    t = escape(it.title or "(без названия)", quote=True)
+                    link = escape(it.link or "", quote=True)
+                    when = it.published_at.strftime("%Y-%m-%d") if it.published_at else ""
+                    preview_items.append(
+                        f"<li><a target=\"_blank\" rel=\"noopener\" href=\"{link}\">{t}</a>"
+                        f" <small>{when}</small></li>"
+                    )
+                    if len(preview_items) >= PREVIEW_ITEMS:
+                        break
 
         if preview_items:
             preview_html = '<ul class="preview">' + ''.join(preview_items) + '</ul>'
@@ -15,6 +15,7 @@ DEFAULT_USER_AGENT = (
 
 SPACE_RE = re.compile(r"\s+")
 URL_RE = re.compile(r"https?://\S+", flags=re.IGNORECASE)
+TITLE_RE = re.compile(r"<title>(.*?)</title>", flags=re.IGNORECASE | re.DOTALL)
 INITIAL_DATA_MARKERS = (
     "var ytInitialData =",
     "window['ytInitialData'] =",
@@ -197,7 +198,7 @@ def _extract_title(player_response: dict[str, object] | None, raw_html: str) ->
             if isinstance(title, str) and title.strip():
                 return _normalize_space(title)
 
-    title_match = re.search(r"<title>(.*?)</title>", raw_html, flags=re.IGNORECASE | re.DOTALL)
+    title_match = TITLE_RE.search(raw_html)
     if title_match:
         text = title_match.group(1)
         return _normalize_space(text.replace("- YouTube", ""))
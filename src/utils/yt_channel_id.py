@@ -5,20 +5,34 @@ import os
 import re
 import ssl
 import sys
+from html.parser import HTMLParser
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlparse
 from urllib.request import Request, urlopen
 
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/119.0 Safari/537.36"
+)
+
 CHANNEL_ID_RE = re.compile(r"(UC[a-zA-Z0-9_-]{22})")
 
 HTML_PATTERNS = [
-    r'itemprop="channelId" content="(UC[a-zA-Z0-9_-]{22})"',
-    r'"channelId":"(UC[a-zA-Z0-9_-]{22})"',
-    r'"externalId":"(UC[a-zA-Z0-9_-]{22})"',
-    r'"browseId":"(UC[a-zA-Z0-9_-]{22})"',
-    r'<link rel="canonical" href="https?://www\.youtube\.com/channel/(UC[a-zA-Z0-9_-]{22})"',
+    re.compile(r'itemprop="channelId" content="(UC[a-zA-Z0-9_-]{22})"'),
+    re.compile(r'"channelId":"(UC[a-zA-Z0-9_-]{22})"'),
+    re.compile(r'"externalId":"(UC[a-zA-Z0-9_-]{22})"'),
+    re.compile(r'"browseId":"(UC[a-zA-Z0-9_-]{22})"'),
+    re.compile(r'<link rel="canonical" href="https?://www\.youtube\.com/channel/(UC[a-zA-Z0-9_-]{22})"'),
 ]
 
+# All HTML patterns fused into one alternation so the page is scanned once; the
+# group number of a match (m.lastindex) is its pattern's position in HTML_PATTERNS.
+HTML_CHANNEL_ID_RE = re.compile("|".join(p.pattern for p in HTML_PATTERNS))
+
+# Literal JSON keys that precede the channel id in YouTube's embedded page data.
+JSON_ANCHORS = (b'"channelId":"', b'"externalId":"')
+
 
 def normalize_url(url: str) -> str:
     url = url.strip()
@@ -41,6 +55,41 @@ def extract_from_path(path: str) -> str | None:
     return None
 
 
+class ChannelHeadParser(HTMLParser):
+    """Incremental parser for the page <head>: finds the channel id in the canonical link
+    or og:url meta tag. Feed it chunks until `channel_id` is set or `done` becomes true.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+        self.channel_id: str | None = None
+        self.done = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.done:
+            return
+        if tag == "body":
+            self.done = True
+            return
+        if tag not in ("link", "meta"):
+            return
+        attr = dict(attrs)
+        if tag == "link" and attr.get("rel") == "canonical":
+            url = attr.get("href")
+        elif tag == "meta" and attr.get("property") == "og:url":
+            url = attr.get("content")
+        else:
+            return
+        channel_id = extract_from_path(urlparse(url or "").path)
+        if channel_id:
+            self.channel_id = channel_id
+            self.done = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            self.done = True
+
+
 def build_ssl_context(insecure: bool, ca_bundle: str | None) -> ssl.SSLContext:
     if insecure:
         return ssl._create_unverified_context()
@@ -58,27 +107,39 @@ def build_ssl_context(insecure: bool, ca_bundle: str | None) -> ssl.SSLContext:
 
 def fetch_html(url: str, timeout: float, insecure: bool, ca_bundle: str | None) -> tuple[str, str]:
     context = build_ssl_context(insecure, ca_bundle)
-    req = Request(
-        url,
-        headers={
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/119.0 Safari/537.36"
-            )
-        },
-    )
+    req = Request(url, headers={"User-Agent": USER_AGENT})
     with urlopen(req, timeout=timeout, context=context) as resp:
         html = resp.read().decode("utf-8", "ignore")
         final_url = resp.geturl()
     return html, final_url
 
 
+def extract_from_json_anchors(raw: bytes) -> str | None:
+    """Find the channel id right after a literal JSON key with bytes.find, no regex."""
+    for anchor in JSON_ANCHORS:
+        idx = raw.find(anchor)
+        while idx >= 0:
+            start = idx + len(anchor)
+            if raw[start + 24 : start + 25] == b'"':
+                candidate = raw[start : start + 24].decode("ascii", "ignore")
+                if CHANNEL_ID_RE.fullmatch(candidate):
+                    return candidate
+            idx = raw.find(anchor, start)
+    return None
+
+
 def extract_from_html(html: str) -> str | None:
-    for pattern in HTML_PATTERNS:
-        match = re.search(pattern, html)
-        if match:
-            return match.group(1)
+    # HTML_PATTERNS order is a priority: "browseId" also tags featured and related
+    # channels, which often come before the page's own "channelId".
+    best: str | None = None
+    best_group = len(HTML_PATTERNS) + 1
+    for match in HTML_CHANNEL_ID_RE.finditer(html):
+        if match.lastindex < best_group:
+            best, best_group = match.group(match.lastindex), match.lastindex
+            if best_group == 1:
+                break
+    if best:
+        return best
     match = CHANNEL_ID_RE.search(html)
     if match:
         return match.group(1)
@@ -0,0 +1,19 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import rssbot.bot as bot_module
+from rssbot.db import User, init_engine, session_scope
+
+
+def test_get_or_create_user_id_registers_once_and_caches(tmp_path, monkeypatch):
+    init_engine(tmp_path / "bot.sqlite")
+    monkeypatch.setattr(bot_module, "DEPS", SimpleNamespace(settings=SimpleNamespace(TZ="UTC")))
+    monkeypatch.setattr(bot_module, "_USER_ID_CACHE", OrderedDict())
+
+    user_id = bot_module._get_or_create_user_id(777)
+    with session_scope() as s:
+        assert s.query(User.id).filter(User.chat_id == 777).scalar() == user_id
+
+    # A cached id is returned without touching the database
+    monkeypatch.setattr(bot_module, "session_scope", None)
+    assert bot_module._get_or_create_user_id(777) == user_id
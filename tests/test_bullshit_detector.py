@@ -2,6 +2,7 @@ import pytest
 
 from rssbot.bullshit_detector import (
     ChannelVideo,
+    _entry_published_ts,
     parse_bullshit_request_text,
     score_video_suspicion,
     shortlist_suspicious_videos,
@@ -48,3 +49,9 @@ def test_shortlist_suspicious_videos_falls_back_to_latest_when_scores_zero():
     ]
     shortlist = shortlist_suspicious_videos(videos, top_k=2)
     assert [video.video_id for video in shortlist] == ["b", "c"]
+
+
+def test_entry_published_ts_accepts_fast_parser_entries():
+    assert _entry_published_ts({"published": "2024-01-02T10:00:00+00:00"}) == 1704189600
+    assert _entry_published_ts({"published_parsed": (2024, 1, 2, 10, 0, 0, 1, 2, 0)}) == 1704189600
+    assert _entry_published_ts({}) == 0
@@ -1,4 +1,4 @@
-from rssbot.config import Settings
+from rssbot.config import Settings, get_settings, reload_settings
 
 
 def test_settings_ignore_unknown_environment_variables(monkeypatch):
@@ -12,3 +12,28 @@ def test_settings_ignore_unknown_environment_variables(monkeypatch):
     settings = Settings(_env_file=None)
 
     assert settings.TELEGRAM_BOT_TOKEN == "123456:ABCDEF"
+
+
+def test_allowed_chat_id_set_parses_once(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "123456:ABCDEF")
+    monkeypatch.setenv("ALLOWED_CHAT_IDS", "1, 2,bad,,3")
+
+    settings = Settings(_env_file=None)
+
+    assert settings.allowed_chat_id_set == frozenset({1, 2, 3})
+    assert settings.allowed_chat_id_set is settings.allowed_chat_id_set
+
+    monkeypatch.setenv("ALLOWED_CHAT_IDS", "")
+    assert Settings(_env_file=None).allowed_chat_id_set is None
+
+
+def test_get_settings_is_cached_until_reload(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "123456:ABCDEF")
+    monkeypatch.setenv("TZ", "Europe/Moscow")
+    first = reload_settings()
+    assert get_settings() is first
+
+    monkeypatch.setenv("TZ", "UTC")
+    assert get_settings().TZ == "Europe/Moscow"
+    assert reload_settings().TZ == "UTC"
+    get_settings.cache_clear()
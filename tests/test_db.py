@@ -0,0 +1,47 @@
+from sqlalchemy import text
+
+from rssbot.db import init_engine
+
+
+def test_init_engine_enables_wal_and_pragmas(tmp_path):
+    engine = init_engine(tmp_path / "bot.sqlite")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+
+def test_init_engine_keeps_connections_pooled(tmp_path):
+    engine = init_engine(tmp_path / "bot.sqlite")
+    with engine.connect() as conn:
+        first = conn.connection.dbapi_connection
+    with engine.connect() as conn:
+        assert conn.connection.dbapi_connection is first
+
+
+def test_init_engine_drops_redundant_item_feed_index(tmp_path):
+    engine = init_engine(tmp_path / "bot.sqlite")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE INDEX ix_items_feed_id ON items (feed_id)")
+    engine = init_engine(tmp_path / "bot.sqlite")
+    with engine.connect() as conn:
+        indexes = {row[1] for row in conn.exec_driver_sql("PRAGMA index_list('items')")}
+        assert "ix_items_feed_id" not in indexes
+        plan = " ".join(
+            str(row[-1])
+            for row in conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM items WHERE feed_id = 1 AND external_id = 'a'"
+            )
+        )
+        # uq_feed_item is backed by SQLite's autoindex on (feed_id, external_id)
+        assert "COVERING INDEX sqlite_autoindex_items" in plan
+
+
+def test_init_engine_adds_missing_columns(tmp_path):
+    engine = init_engine(tmp_path / "bot.sqlite")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE feeds DROP COLUMN http_body_hash")
+    engine = init_engine(tmp_path / "bot.sqlite")
+    with engine.connect() as conn:
+        columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(feeds)")}
+    assert "http_body_hash" in columns
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import rssbot.bot as bot_module
+from rssbot.db import Delivery, Feed, Item, User, init_engine, session_scope
+
+
+class DummyScheduler:
+    def __init__(self) -> None:
+        self.unscheduled: list[int] = []
+
+    def unschedule_feed_polls(self, feed_ids) -> None:
+        self.unscheduled.extend(feed_ids)
+
+
+def test_dedupe_user_feeds_merges_items_and_deliveries(tmp_path, monkeypatch):
+    init_engine(tmp_path / "bot.sqlite")
+    scheduler = DummyScheduler()
+    monkeypatch.setattr(bot_module, "DEPS", SimpleNamespace(scheduler=scheduler))
+
+    url = "https://example.com/rss.xml"
+    with session_scope() as s:
+        user = User(chat_id=1, tz="UTC")
+        s.add(user)
+        s.flush()
+        keep = Feed(user_id=user.id, url=url, mode="immediate", enabled=True, poll_interval_min=10)
+        dup = Feed(user_id=user.id, url=url, mode="immediate", enabled=False, poll_interval_min=10)
+        s.add_all([keep, dup])
+        s.flush()
+        s.add_all(
+            [
+                Item(feed_id=keep.id, external_id="a"),
+                Item(feed_id=keep.id, external_id="b"),
+            ]
+        )
+        dup_b = Item(feed_id=dup.id, external_id="b")
+        dup_c = Item(feed_id=dup.id, external_id="c")
+        s.add_all([dup_b, dup_c])
+        s.flush()
+        s.add_all(
+            [
+                Delivery(item_id=dup_b.id, feed_id=dup.id, user_id=user.id, channel="immediate"),
+                Delivery(item_id=dup_c.id, feed_id=dup.id, user_id=user.id, channel="immediate"),
+            ]
+        )
+        user_id, keep_id, dup_id, dup_c_id = user.id, keep.id, dup.id, dup_c.id
+
+    assert bot_module._dedupe_user_feeds(user_id) == 1
+    assert scheduler.unscheduled == [dup_id]
+
+    with session_scope() as s:
+        assert s.get(Feed, dup_id) is None
+        kept = s.query(Item.external_id).filter(Item.feed_id == keep_id)
+        ext_ids = sorted(ext for (ext,) in kept)
+        assert ext_ids == ["a", "b", "c"]
+        deliveries = s.query(Delivery).all()
+        assert [(d.item_id, d.feed_id) for d in deliveries] == [(dup_c_id, keep_id)]
+
+
+def test_dedupe_user_feeds_without_duplicates_is_noop(tmp_path, monkeypatch):
+    init_engine(tmp_path / "bot.sqlite")
+    scheduler = DummyScheduler()
+    monkeypatch.setattr(bot_module, "DEPS", SimpleNamespace(scheduler=scheduler))
+
+    with session_scope() as s:
+        user = User(chat_id=2, tz="UTC")
+        s.add(user)
+        s.flush()
+        s.add_all(
+            [
+                Feed(user_id=user.id, url="https://example.com/a.xml", mode="immediate"),
+                Feed(user_id=user.id, url="https://example.com/b.xml", mode="immediate"),
+            ]
+        )
+        user_id = user.id
+
+    assert bot_module._dedupe_user_feeds(user_id) == 0
+    assert scheduler.unscheduled == []
+    with session_scope() as s:
+        assert s.query(Feed).filter(Feed.user_id == user_id).count() == 2
@@ -0,0 +1,125 @@
+import asyncio
+from types import SimpleNamespace
+
+import rssbot.bot as bot_module
+from rssbot.db import Delivery, Feed, FeedRule, Item, User, init_engine, session_scope
+
+
+class DummyScheduler:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    def schedule_feed_poll(self, feed_id: int, interval: int) -> None:
+        self.calls.append(("schedule", feed_id, interval))
+
+    def unschedule_feed_poll(self, feed_id: int) -> None:
+        self.calls.append(("unschedule", feed_id))
+
+
+def _seed_feed(tmp_path):
+    init_engine(tmp_path / "bot.sqlite")
+    with session_scope() as s:
+        owner = User(chat_id=1, tz="UTC")
+        other = User(chat_id=2, tz="UTC")
+        s.add_all([owner, other])
+        s.flush()
+        feed = Feed(
+            user_id=owner.id, url="https://example.com/rss", mode="immediate", poll_interval_min=15
+        )
+        s.add(feed)
+        s.flush()
+        item = Item(feed_id=feed.id, external_id="a")
+        s.add_all([item, FeedRule(feed_id=feed.id)])
+        s.flush()
+        s.add(Delivery(item_id=item.id, feed_id=feed.id, user_id=owner.id, channel="immediate"))
+        return owner.id, other.id, feed.id
+
+
+def test_mute_and_unmute_check_ownership_in_update(tmp_path, monkeypatch):
+    owner_id, other_id, feed_id = _seed_feed(tmp_path)
+    scheduler = DummyScheduler()
+    monkeypatch.setattr(bot_module, "DEPS", SimpleNamespace(scheduler=scheduler))
+
+    with session_scope() as s:
+        assert bot_module._mute_feed(s, feed_id, other_id) is None
+        assert bot_module._mute_feed(s, feed_id, owner_id) is not None
+    with session_scope() as s:
+        assert s.get(Feed, feed_id).enabled is False
+        assert bot_module._unmute_feed(s, feed_id, owner_id) is not None
+    with session_scope() as s:
+        assert s.get(Feed, feed_id).enabled is True
+    assert scheduler.calls == [("unschedule", feed_id), ("schedule", feed_id, 15)]
+
+
+def test_remove_feed_deletes_dependent_rows(tmp_path, monkeypatch):
+    owner_id, other_id, feed_id = _seed_feed(tmp_path)
+    monkeypatch.setattr(bot_module, "DEPS", SimpleNamespace(scheduler=DummyScheduler()))
+
+    with session_scope() as s:
+        assert bot_module._remove_feed(s, feed_id, other_id) is None
+    with session_scope() as s:
+        assert bot_module._remove_feed(s, feed_id, owner_id) is not None
+    with session_scope() as s:
+        assert s.get(Feed, feed_id) is None
+        for model in (FeedRule, Delivery, Item):
+            assert s.query(model).filter(model.feed_id == feed_id).count() == 0
+
+
+class DummyMessage:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.answers: list[str] = []
+
+    async def answer(self, text: str, **kwargs) -> None:
+        self.answers.append(text)
+
+
+def test_setfilter_upserts_rules_and_keeps_unset_fields(tmp_path, monkeypatch):
+    owner_id, other_id, feed_id = _seed_feed(tmp_path)
+    monkeypatch.setattr(bot_module, "_ensure_user_id", lambda _message: owner_id)
+
+    message = DummyMessage(f'/setfilter {feed_id} {{"include_keywords": ["a"], "unknown": 1}}')
+    asyncio.run(bot_module.cmd_setfilter(message))
+    message = DummyMessage(f'/setfilter {feed_id} {{"require_all": 1}}')
+    asyncio.run(bot_module.cmd_setfilter(message))
+    assert message.answers == ["Фильтры обновлены."]
+
+    with session_scope() as s:
+        rules = s.query(FeedRule).filter(FeedRule.feed_id == feed_id).one()
+        assert rules.include_keywords == ["a"]
+        assert rules.require_all is True
+
+    monkeypatch.setattr(bot_module, "_ensure_user_id", lambda _message: other_id)
+    message = DummyMessage(f'/setfilter {feed_id} {{"require_all": false}}')
+    asyncio.run(bot_module.cmd_setfilter(message))
+    assert message.answers == ["Лента не найдена."]
+
+
+def test_digest_all_sends_feeds_one_after_another(tmp_path, monkeypatch):
+    owner_id, _, feed_id = _seed_feed(tmp_path)
+    with session_scope() as s:
+        second = Feed(user_id=owner_id, url="https://example.com/other", mode="digest")
+        s.add(second)
+        s.flush()
+        second_id = second.id
+
+    running = 0
+    sent: list[int] = []
+
+    class DigestScheduler:
+        async def _send_digest_for_feed(self, fid, *, update_last_digest_at=True):
+            nonlocal running
+            running += 1
+            assert running == 1
+            await asyncio.sleep(0)
+            running -= 1
+            if fid == feed_id:
+                raise RuntimeError("boom")
+            sent.append(fid)
+
+    monkeypatch.setattr(bot_module, "DEPS", SimpleNamespace(scheduler=DigestScheduler()))
+    monkeypatch.setattr(bot_module, "_ensure_user_id", lambda _message: owner_id)
+    message = DummyMessage("/digest all")
+    asyncio.run(bot_module.cmd_digest(message))
+    assert sent == [second_id]
+    assert message.answers == ["Дайджест отправлен для 1 лент. Ошибок: 1."]
@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+from rssbot.bot import (
+    FeedOptions,
+    _looks_like_channel_id,
+    _looks_like_playlist_id,
+    _parse_feed_args,
+)
+
+
+SETTINGS = SimpleNamespace(DEFAULT_POLL_INTERVAL_MIN=10)
+
+
+def test_parse_feed_args_defaults():
+    assert _parse_feed_args([], SETTINGS) == FeedOptions("immediate", None, 10, None)
+
+
+def test_parse_feed_args_all_options():
+    tokens = ["digest", "label=News", "interval=30", "time=08:15"]
+    assert _parse_feed_args(tokens, SETTINGS) == FeedOptions("digest", "News", 30, "08:15")
+
+
+def test_parse_feed_args_ignores_bad_interval_and_empty_time():
+    tokens = ["mode=on_demand", "interval=abc", "time="]
+    assert _parse_feed_args(tokens, SETTINGS) == FeedOptions("on_demand", None, 10, None)
+
+
+def test_channel_and_playlist_id_validation():
+    assert _looks_like_channel_id("UCabcdefghijklmnopqrstuv")
+    assert not _looks_like_channel_id("UCshort")
+    assert not _looks_like_channel_id("https://youtube.com/@name")
+    assert _looks_like_playlist_id("PLabcdefghij12345")
+    assert _looks_like_playlist_id("UUabcdefghijklmnopqrstuv")
+    assert not _looks_like_playlist_id("PLshort")
+    assert not _looks_like_playlist_id("XXabcdefghij12345")
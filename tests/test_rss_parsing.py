@@ -3,13 +3,28 @@ from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
 from rssbot.db import init_engine, session_scope, User, Feed, Item
+import feedparser
+
 from rssbot.rss import (
+    _entry_external_id,
+    _dated_entries,
+    _entry_sort_key,
     _extract_video_id,
+    _iter_unfolded_ics_lines,
+    _parse_youtube_feed,
+    entry_published_at,
+    _store_events,
+    _summary_hash,
     _normalized_event_rows,
+    _parse_event_datetime,
     _normalized_ics_event_rows,
+    _parse_ics_datetime,
     compute_available_at,
     fetch_and_store_event_source,
+    fetch_and_store_feed,
     fetch_and_store_latest_item,
+    fetch_and_store_many,
+    fetch_and_store_recent,
 )
 
 
@@ -21,6 +36,43 @@ def test_extract_video_id_variants():
     assert _extract_video_id(entry2) == "ABCDEF12345"
 
 
+def test_parse_youtube_feed_matches_feedparser():
+    xml = b"""<?xml version="1.0" encoding="UTF-8"?>
+    <feed xmlns:yt="http://www.youtube.com/xml/schemas/2015"
+          xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">
+      <link rel="self" href="http://www.youtube.com/feeds/videos.xml?channel_id=UC123"/>
+      <id>yt:channel:UC123</id>
+      <yt:channelId>UC123</yt:channelId>
+      <title> Channel &amp; Co </title>
+      <entry>
+        <id>yt:video:VID1</id>
+        <yt:videoId>VID1</yt:videoId>
+        <title>
+          Stream 12.03 19:00  </title>
+        <link rel="alternate" href="https://www.youtube.com/watch?v=VID1"/>
+        <author><name> Channel &amp; Co </name></author>
+        <published> 2024-01-02T10:00:00+00:00 </published>
+        <updated>2024-01-03T00:00:00+00:00</updated>
+        <media:group><media:description> About the stream </media:description></media:group>
+      </entry>
+    </feed>"""
+
+    fast = _parse_youtube_feed(xml)
+    slow = feedparser.parse(xml)
+    assert fast is not None
+    assert fast["feed"]["title"] == slow["feed"]["title"]
+    assert len(fast["entries"]) == len(slow["entries"]) == 1
+    for mine, ref in zip(fast["entries"], slow["entries"]):
+        assert _entry_external_id(mine) == _entry_external_id(ref) == "VID1"
+        for key in ("title", "link", "author", "summary"):
+            assert mine[key] == ref.get(key)
+        assert mine["title"] == "Stream 12.03 19:00"
+        assert entry_published_at(mine) == entry_published_at(ref)
+        assert _summary_hash(mine) == _summary_hash(ref)
+
+    assert _parse_youtube_feed(b"<rss><channel><title>x</title></channel></rss>") is None
+
+
 def test_fetch_and_store_latest_item(monkeypatch, tmp_path):
     # Initialize isolated DB
     db_path = tmp_path / "bot.sqlite"
@@ -82,6 +134,123 @@ def test_fetch_and_store_latest_item(monkeypatch, tmp_path):
         assert s.query(Item).count() == 1
 
 
+def test_latest_entry_is_found_without_trusting_feed_order():
+    entries = [
+        {"id": "a", "published": "2024-01-02T00:00:00+00:00"},
+        {"id": "b", "published": "2024-01-05T00:00:00+00:00"},
+        {"id": "c"},
+        {"id": "d", "published": "2024-01-01T00:00:00+00:00"},
+    ]
+    latest_dt, latest = max(_dated_entries(entries), key=_entry_sort_key)
+    assert latest["id"] == "b"
+    assert latest_dt == datetime(2024, 1, 5, tzinfo=timezone.utc)
+
+
+def test_fetch_and_store_recent_skips_known_and_repeated_entries(monkeypatch, tmp_path):
+    init_engine(tmp_path / "bot.sqlite")
+    with session_scope() as s:
+        user = User(chat_id=124, tz="UTC")
+        s.add(user)
+        s.flush()
+        feed = Feed(user_id=user.id, url="https://example/youtube/rss", enabled=True, mode="immediate")
+        s.add(feed)
+        s.flush()
+        s.add(Item(feed_id=feed.id, external_id="VID3"))
+        feed_id = feed.id
+
+    def entry(vid: str, day: int) -> str:
+        return f"""
+          <entry>
+            <id>yt:video:{vid}</id>
+            <link rel="alternate" href="https://www.youtube.com/watch?v={vid}"/>
+            <title>{vid}</title>
+            <published>2024-01-0{day}T00:00:00+00:00</published>
+          </entry>"""
+
+    xml = (
+        "<?xml version='1.0' encoding='UTF-8'?>"
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        + entry("VID3", 3)
+        + entry("VID2", 2)
+        + entry("VID2", 2)
+        + entry("VID1", 1)
+        + "</feed>"
+    ).encode("utf-8")
+
+    async def fake_fetch_http(feed):
+        return 200, None, None, xml
+
+    from rssbot import rss as rss_mod
+
+    monkeypatch.setattr(rss_mod, "fetch_feed_http", fake_fetch_http)
+
+    created_ids = asyncio.run(fetch_and_store_recent(feed_id, 5))
+    with session_scope() as s:
+        stored = [s.get(Item, item_id).external_id for item_id in created_ids]
+        assert stored == ["VID2", "VID1"]
+        assert s.query(Item).filter(Item.feed_id == feed_id).count() == 3
+    assert asyncio.run(fetch_and_store_recent(feed_id, 5)) == []
+
+
+def test_fetch_and_store_feed_skips_unchanged_body(monkeypatch, tmp_path):
+    init_engine(tmp_path / "bot.sqlite")
+    with session_scope() as s:
+        user = User(chat_id=125, tz="UTC")
+        s.add(user)
+        s.flush()
+        feed = Feed(user_id=user.id, url="https://example/youtube/rss", enabled=True, mode="immediate")
+        s.add(feed)
+        s.flush()
+        feed_id = feed.id
+
+    xml = (
+        b"<?xml version='1.0' encoding='UTF-8'?>"
+        b'<feed xmlns="http://www.w3.org/2005/Atom"><title>Channel</title>'
+        b"<entry><id>yt:video:VID1</id><title>One</title>"
+        b'<link rel="alternate" href="https://www.youtube.com/watch?v=VID1"/></entry></feed>'
+    )
+
+    async def fake_fetch_http(feed):
+        return 200, None, None, xml
+
+    from rssbot import rss as rss_mod
+
+    monkeypatch.setattr(rss_mod, "fetch_feed_http", fake_fetch_http)
+    assert len(asyncio.run(fetch_and_store_feed(feed_id))) == 1
+
+    def fail_parse(content):
+        raise AssertionError("unchanged body must not be parsed")
+
+    monkeypatch.setattr(rss_mod, "parse_feed", fail_parse)
+    assert asyncio.run(fetch_and_store_feed(feed_id)) == []
+    with session_scope() as s:
+        feed = s.get(Feed, feed_id)
+        assert feed.name == "Channel"
+        assert feed.http_body_hash and feed.last_poll_at is not None
+
+
+def test_fetch_and_store_many_bounds_concurrency_and_keeps_order():
+    running = 0
+    peak = 0
+
+    async def fake_fetch(feed_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if feed_id == 3:
+            raise RuntimeError("boom")
+        return [feed_id * 10]
+
+    results = asyncio.run(fetch_and_store_many([1, 2, 3, 4, 5], fake_fetch, concurrency=2))
+
+    assert peak == 2
+    assert results[:2] == [[10], [20]]
+    assert isinstance(results[2], RuntimeError)
+    assert results[3:] == [[40], [50]]
+
+
 def test_normalized_event_rows_accepts_array_and_object():
     tz = ZoneInfo("Europe/Moscow")
     payload_obj = {
@@ -147,6 +316,74 @@ def test_normalized_ics_event_rows_supports_url_description_and_tzid():
     assert rows[1]["published_at"] == datetime(2026, 2, 10, 16, 30, tzinfo=timezone.utc)
 
 
+def test_iter_unfolded_ics_lines_joins_continuations():
+    text = "BEGIN:VEVENT\r\nSUMMARY:Long\r\n  title\r\n\tend\rUID:1\nEND:VEVENT"
+    assert list(_iter_unfolded_ics_lines(text)) == [
+        "BEGIN:VEVENT",
+        "SUMMARY:Long titleend",
+        "UID:1",
+        "END:VEVENT",
+    ]
+
+
+def test_parse_ics_datetime_falls_back_for_unknown_tzid():
+    tz = ZoneInfo("Europe/Moscow")
+    for _ in range(2):  # second call hits the cached miss
+        dt = _parse_ics_datetime("20260210T193000", {"TZID": "W. Europe Standard Time"}, tz)
+        assert dt == datetime(2026, 2, 10, 16, 30, tzinfo=timezone.utc)
+
+
+def test_parse_ics_datetime_fixed_width_forms():
+    tz = ZoneInfo("Europe/Moscow")
+    expected = datetime(2026, 2, 10, 16, 30, tzinfo=timezone.utc)
+    assert _parse_ics_datetime("20260210T163000Z", {}, tz) == expected
+    # HHMM without seconds used to be read by strptime as 16:03
+    assert _parse_ics_datetime("20260210T1630Z", {}, tz) == expected
+    assert _parse_ics_datetime("20260210T1930", {}, tz) == expected
+    midnight_msk = datetime(2026, 2, 9, 21, 0, tzinfo=timezone.utc)
+    assert _parse_ics_datetime("20260210", {"VALUE": "DATE"}, tz) == midnight_msk
+    assert _parse_ics_datetime("20260230T100000", {}, tz) is None
+
+
+def test_parse_event_datetime_is_memoised_per_timezone():
+    msk, utc = ZoneInfo("Europe/Moscow"), ZoneInfo("UTC")
+    first = _parse_event_datetime(" 10.02.2026 19:30 ", msk)
+    assert first == datetime(2026, 2, 10, 16, 30, tzinfo=timezone.utc)
+    assert _parse_event_datetime("10.02.2026 19:30", msk) is first
+    second = _parse_event_datetime("10.02.2026 19:30", utc)
+    assert second == datetime(2026, 2, 10, 19, 30, tzinfo=timezone.utc)
+
+
+def test_store_events_dedupes_within_payload_and_by_fingerprint(tmp_path):
+    init_engine(tmp_path / "bot.sqlite")
+    start = datetime(2026, 2, 10, 16, 30, tzinfo=timezone.utc)
+    with session_scope() as s:
+        user = User(chat_id=890, tz="UTC")
+        s.add(user)
+        s.flush()
+        feed = Feed(
+            user_id=user.id, url="https://example/e.ics", type="event_ics", mode="immediate"
+        )
+        s.add(feed)
+        s.flush()
+        feed_id = feed.id
+
+    def ev(ext_id, title, link="https://example.com/e"):
+        return {"external_id": ext_id, "title": title, "link": link, "published_at": start}
+
+    with session_scope() as s:
+        events = [ev("a", "One"), ev("a", "One", "https://example.com/a2")]
+        created = _store_events(s, feed_id, events, True)
+        assert len(created) == 1
+    with session_scope() as s:
+        # New UID, same title and start -> matched by fingerprint; "b" is new
+        assert _store_events(s, feed_id, [ev("z", "one "), ev("b", "Two")], True) != []
+    with session_scope() as s:
+        items = s.query(Item).filter(Item.feed_id == feed_id)
+        rows = sorted((it.external_id, it.title) for it in items)
+        assert rows == [("a", "one "), ("b", "Two")]
+
+
 def test_fetch_and_store_event_source(monkeypatch, tmp_path):
     db_path = tmp_path / "bot.sqlite"
     init_engine(db_path)
@@ -240,6 +477,37 @@ def test_fetch_and_store_event_source_ics(monkeypatch, tmp_path):
         assert items[0].published_at == datetime(2026, 2, 10, 16, 30)
 
 
+def test_fetch_and_store_event_source_skips_unchanged_body(monkeypatch, tmp_path):
+    init_engine(tmp_path / "bot.sqlite")
+    with session_scope() as s:
+        user = User(chat_id=891, tz="UTC")
+        s.add(user)
+        s.flush()
+        feed = Feed(
+            user_id=user.id, url="https://example/e.json", type="event_json", mode="immediate"
+        )
+        s.add(feed)
+        s.flush()
+        feed_id = feed.id
+
+    from rssbot import rss as rss_mod
+
+    async def fake_fetch_http(feed):
+        return 200, None, None, b"[]"
+
+    rows = [{"external_id": "e1", "title": "Event", "link": "https://example.com/e1",
+             "published_at": datetime(2026, 2, 10, 16, 30, tzinfo=timezone.utc)}]
+    monkeypatch.setattr(rss_mod, "fetch_feed_http", fake_fetch_http)
+    monkeypatch.setattr(rss_mod, "_event_rows_from_payload", lambda *args: rows)
+    assert len(asyncio.run(fetch_and_store_event_source(feed_id))) == 1
+
+    def fail_parse(*args):
+        raise AssertionError("unchanged body must not be parsed")
+
+    monkeypatch.setattr(rss_mod, "_event_rows_from_payload", fail_parse)
+    assert asyncio.run(fetch_and_store_event_source(feed_id)) == []
+
+
 def test_fetch_and_store_event_source_ics_mutating_uid_and_link_does_not_duplicate(monkeypatch, tmp_path):
     db_path = tmp_path / "bot.sqlite"
     init_engine(db_path)
@@ -310,3 +578,50 @@ def test_compute_available_at_normalizes_naive_datetime():
     assert available is not None
     assert available.tzinfo is not None
     assert available.utcoffset() == timezone.utc.utcoffset(available)
+
+
+def test_fetch_feed_http_drops_validators_of_oversized_body(monkeypatch):
+    import rssbot.rss as rss_mod
+
+    class FakeContent:
+        async def iter_chunked(self, _size):
+            yield b"x" * (rss_mod.FEED_MAX_BYTES + 1)
+
+    class FakeResponse:
+        status = 200
+        headers = {"ETag": '"v2"', "Last-Modified": "Tue, 02 Jan 2024 00:00:00 GMT"}
+        content_length = None
+        content = FakeContent()
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class FakeSession:
+        def get(self, _url, headers=None):
+            return FakeResponse()
+
+    async def fake_session():
+        return FakeSession()
+
+    monkeypatch.setattr(rss_mod, "get_feed_http_session", fake_session)
+    feed = rss_mod.FeedSnapshot(1, "https://example/rss", "youtube", '"v1"', None, None)
+
+    assert asyncio.run(rss_mod.fetch_feed_http(feed)) == (200, None, None, None)
+    FakeResponse.content_length = rss_mod.FEED_MAX_BYTES + 1
+    assert asyncio.run(rss_mod.fetch_feed_http(feed)) == (200, None, None, None)
+
+
+def test_feed_http_session_is_replaced_and_closed_across_event_loops():
+    import rssbot.rss as rss_mod
+
+    first = asyncio.run(rss_mod.get_feed_http_session())
+    second = asyncio.run(rss_mod.get_feed_http_session())
+    try:
+        assert second is not first
+        assert first.closed
+    finally:
+        asyncio.run(rss_mod.close_feed_http_session())
+    assert second.closed
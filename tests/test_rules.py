@@ -1,5 +1,5 @@
-from rssbot.rules import Content, matches_rules
-from rssbot.db import FeedRule
+from rssbot.rules import Content, compile_rules, matches_rules, rules_to_sql
+from rssbot.db import Feed, FeedRule, Item, User, init_engine, session_scope
 
 
 def test_rules_include_exclude_keywords():
@@ -39,3 +39,105 @@ def test_rules_duration_bounds():
     assert matches_rules(Content(title="A", duration_sec=10), rules) is False
     assert matches_rules(Content(title="A", duration_sec=7200), rules) is False
 
+
+
+def test_compile_rules_is_shared_and_follows_edits():
+    rules = FeedRule(feed_id=1, include_keywords=["Обзор", ""], categories=["Tech"])
+    compiled = compile_rules(rules)
+    assert compiled.include_keywords == ("обзор",)
+    assert compiled.categories == frozenset({"tech"})
+    same = FeedRule(feed_id=2, include_keywords=["Обзор", ""], categories=["Tech"])
+    assert compile_rules(same) is compiled
+
+    rules.include_keywords = ["стрим"]
+    assert compile_rules(rules).include_keywords == ("стрим",)
+    assert matches_rules(Content(title="Стрим", categories=["tech"]), rules) is True
+
+    # An include list of only blanks still rejects everything, as before
+    assert matches_rules(Content(title="A"), FeedRule(feed_id=1, include_keywords=[""])) is False
+
+
+def test_compile_rules_precompiles_regex_and_skips_invalid():
+    rules = FeedRule(feed_id=1, include_regex=["python\\s+tips", "("], case_sensitive=False)
+    compiled = compile_rules(rules)
+    assert [p.pattern for p in compiled.include_regex] == ["python\\s+tips"]
+    assert matches_rules(Content(title="PYTHON  Tips"), rules) is True
+
+    # Only invalid include patterns: nothing can match, as before
+    assert matches_rules(Content(title="x"), FeedRule(feed_id=1, include_regex=["("])) is False
+
+
+def test_regex_patterns_are_shared_between_rules():
+    a = compile_rules(FeedRule(feed_id=1, exclude_regex=["shorts?"]))
+    b = compile_rules(FeedRule(feed_id=2, exclude_regex=["shorts?", "live"]))
+    assert a.exclude_regex[0] is b.exclude_regex[0]
+    c = compile_rules(FeedRule(feed_id=3, exclude_regex=["shorts?"], case_sensitive=True))
+    assert c.exclude_regex[0] is not a.exclude_regex[0]
+
+
+def test_long_keyword_lists_match_with_and_without_automaton(monkeypatch):
+    import rssbot.rules as rules_module
+
+    words = [f"word{i}" for i in range(10)]
+    any_rule = FeedRule(feed_id=1, exclude_keywords=words + ["Стрим"])
+    all_rule = FeedRule(feed_id=1, include_keywords=words, require_all=True)
+    hit = Content(title="стрим WORD3")
+    full = Content(title=" ".join(words), description="word0 again")
+    partial = Content(title=" ".join(words[:-1]))
+
+    for lib in (rules_module.ahocorasick, None):
+        monkeypatch.setattr(rules_module, "ahocorasick", lib)
+        rules_module._compile_rules.cache_clear()
+        assert (compile_rules(any_rule).exclude_automaton is not None) is (lib is not None)
+        assert matches_rules(hit, any_rule) is False
+        assert matches_rules(Content(title="nothing here"), any_rule) is True
+        assert matches_rules(full, all_rule) is True
+        assert matches_rules(partial, all_rule) is False
+
+
+def test_rules_to_sql_never_drops_items_python_keeps(tmp_path):
+    init_engine(tmp_path / "bot.sqlite")
+    titles = [
+        None,
+        "Обзор Python",
+        "ОБЗОР python",
+        "СТРИМ 100%",
+        "стрим_live",
+        "Live Stream",
+        "Short",
+    ]
+    durations = [None, 60, 600, 3600]
+    with session_scope() as s:
+        user = User(chat_id=1, tz="UTC")
+        s.add(user)
+        s.flush()
+        feed = Feed(user_id=user.id, url="https://example.com/rss")
+        s.add(feed)
+        s.flush()
+        s.add_all(
+            [
+                Item(feed_id=feed.id, external_id=f"{i}-{j}", title=title, duration_sec=duration)
+                for i, title in enumerate(titles)
+                for j, duration in enumerate(durations)
+            ]
+        )
+
+    rule_sets = [
+        FeedRule(include_keywords=["обзор"], exclude_keywords=["стрим"], min_duration_sec=120),
+        FeedRule(include_keywords=["Python", "Live"], case_sensitive=True, max_duration_sec=600),
+        FeedRule(include_keywords=["Обзор", "Python"], require_all=True, case_sensitive=True),
+        FeedRule(exclude_keywords=["100%", "_live"], categories=["news"]),
+        FeedRule(exclude_keywords=["Live"], case_sensitive=True),
+    ]
+    with session_scope() as s:
+        for rules in rule_sets:
+            kept = {
+                it.id
+                for it in s.query(Item)
+                if matches_rules(Content(title=it.title or "", duration_sec=it.duration_sec), rules)
+            }
+            pushed = {it.id for it in s.query(Item).filter(*rules_to_sql(rules))}
+            assert kept <= pushed
+        # Filters that SQLite can evaluate exactly do narrow the candidates
+        assert s.query(Item).filter(*rules_to_sql(rule_sets[4])).count() == 24
+    assert rules_to_sql(None) == []
@@ -0,0 +1,198 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import rssbot.scheduler as scheduler_module
+from rssbot.db import Delivery, Feed, FeedBaseline, Item, User, init_engine, session_scope
+from rssbot.scheduler import BotScheduler
+
+
+class DummyBot:
+    def __init__(self) -> None:
+        self.messages: list[tuple[int, str, object]] = []
+
+    async def send_message(self, chat_id: int, text: str, reply_markup=None):
+        self.messages.append((chat_id, text, reply_markup))
+        return {"ok": True}
+
+
+def _sent_titles(bot: DummyBot) -> list[str]:
+    return [text.split(":", 1)[1].split("[")[0].strip() for _, text, _ in bot.messages]
+
+
+def _init_db(tmp_path, monkeypatch):
+    init_engine(tmp_path / "bot.sqlite")
+    settings = SimpleNamespace(HIDE_FUTURE_VIDEOS=False)
+    monkeypatch.setattr(scheduler_module, "get_settings", lambda: settings)
+
+
+def _digest_feed(user_id: int, url: str, at: str = "09:00") -> Feed:
+    return Feed(user_id=user_id, url=url, mode="digest", digest_time_local=at)
+
+
+def _seed_digest_feed(tmp_path, monkeypatch):
+    _init_db(tmp_path, monkeypatch)
+    with session_scope() as s:
+        user = User(chat_id=555, tz="UTC")
+        s.add(user)
+        s.flush()
+        feed = _digest_feed(user.id, "https://example.com/rss")
+        s.add(feed)
+        s.flush()
+        return user.id, feed.id
+
+
+def test_send_digest_skips_delivered_and_pre_baseline_items(tmp_path, monkeypatch):
+    user_id, feed_id = _seed_digest_feed(tmp_path, monkeypatch)
+    t0 = datetime(2024, 1, 1, 12, 0)
+    with session_scope() as s:
+        s.add(
+            FeedBaseline(
+                feed_id=feed_id,
+                baseline_item_external_id="base",
+                baseline_published_at=t0,
+                baseline_set_at=t0,
+            )
+        )
+        hour = timedelta(hours=1)
+        s.add_all(
+            [
+                Item(feed_id=feed_id, external_id="base", title="Base", published_at=t0 + 5 * hour),
+                Item(feed_id=feed_id, external_id="old", title="Old", published_at=t0 - hour),
+                Item(feed_id=feed_id, external_id="new", title="New", published_at=t0 + hour),
+                Item(
+                    feed_id=feed_id,
+                    external_id="undated",
+                    title="Undated",
+                    created_at=t0 + 2 * hour,
+                ),
+            ]
+        )
+        seen = Item(feed_id=feed_id, external_id="seen", title="Seen", published_at=t0 + 2 * hour)
+        s.add(seen)
+        s.flush()
+        s.add(Delivery(item_id=seen.id, feed_id=feed_id, user_id=user_id, channel="immediate"))
+
+    bot = DummyBot()
+    asyncio.run(BotScheduler(bot=bot)._send_digest_for_feed(feed_id))
+
+    assert _sent_titles(bot) == ["New", "Undated"]
+    with session_scope() as s:
+        digest = s.query(Delivery).filter(Delivery.channel == "digest").all()
+        assert [(d.user_id, d.status) for d in digest] == [(user_id, "ok"), (user_id, "ok")]
+        assert all(d.sent_at is not None for d in digest)
+        assert s.get(Feed, feed_id).last_digest_at is not None
+
+
+def test_send_digest_caps_messages_per_run(tmp_path, monkeypatch):
+    _, feed_id = _seed_digest_feed(tmp_path, monkeypatch)
+    t0 = datetime(2024, 1, 1, 12, 0)
+    with session_scope() as s:
+        s.add_all(
+            [
+                Item(
+                    feed_id=feed_id,
+                    external_id=f"v{i}",
+                    title=f"Video {i}",
+                    published_at=t0 + timedelta(minutes=i),
+                )
+                for i in range(25)
+            ]
+        )
+
+    bot = DummyBot()
+    scheduler = BotScheduler(bot=bot)
+    asyncio.run(scheduler._send_digest_for_feed(feed_id))
+    assert len(bot.messages) == scheduler_module.DIGEST_MAX_ITEMS
+    assert "Video 24" in bot.messages[0][1]
+
+    # The remaining five go out with the next digest
+    asyncio.run(scheduler._send_digest_for_feed(feed_id))
+    assert len(bot.messages) == 25
+
+
+def test_digest_scan_tick_sends_chats_concurrently_in_per_chat_order(tmp_path, monkeypatch):
+    _init_db(tmp_path, monkeypatch)
+
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2024, 1, 2, 9, 0, tzinfo=tz)
+
+    monkeypatch.setattr(scheduler_module, "datetime", FixedDatetime)
+
+    t0 = datetime(2024, 1, 1)
+    with session_scope() as s:
+        for chat_id in (1, 2, 3):
+            user = User(chat_id=chat_id, tz="UTC")
+            s.add(user)
+            s.flush()
+            for n in range(2 if chat_id == 1 else 1):
+                feed = _digest_feed(user.id, f"https://e/{chat_id}/{n}")
+                s.add(feed)
+                s.flush()
+                title = f"{chat_id}-{n}"
+                s.add(Item(feed_id=feed.id, external_id="v", title=title, published_at=t0))
+        # Not due: other time of day
+        s.add(_digest_feed(user.id, "https://e/late", at="18:00"))
+
+    running = 0
+    peak = 0
+
+    class SlowBot(DummyBot):
+        async def send_message(self, chat_id, text, reply_markup=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return await super().send_message(chat_id, text, reply_markup)
+
+    bot = SlowBot()
+    asyncio.run(BotScheduler(bot=bot)._digest_scan_tick())
+
+    assert peak == 3
+    titles = _sent_titles(bot)
+    assert sorted(titles) == ["1-0", "1-1", "2-0", "3-0"]
+    assert titles.index("1-0") < titles.index("1-1")
+
+
+def test_digest_scan_tick_persists_next_fire_time(tmp_path, monkeypatch):
+    _, feed_id = _seed_digest_feed(tmp_path, monkeypatch)
+    now = datetime(2024, 1, 2, 9, 0, 30, tzinfo=timezone.utc)
+
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr(scheduler_module, "datetime", FixedDatetime)
+    day = timedelta(days=1)
+    with session_scope() as s:
+        s.add(Item(feed_id=feed_id, external_id="v", title="Video", published_at=now - day))
+
+    bot = DummyBot()
+    scheduler = BotScheduler(bot=bot)
+    asyncio.run(scheduler._digest_scan_tick())
+    assert len(bot.messages) == 1
+    with session_scope() as s:
+        feed = s.get(Feed, feed_id)
+        assert feed.next_digest_at_utc == datetime(2024, 1, 3, 9, 0)
+        # Changing the schedule clears the stored fire time
+        feed.digest_time_local = "18:00"
+        assert feed.next_digest_at_utc is None
+
+    # Hours later the feed is picked up again only to store its new slot
+    now = datetime(2024, 1, 3, 8, 0, tzinfo=timezone.utc)
+    asyncio.run(scheduler._digest_scan_tick())
+    assert len(bot.messages) == 1
+    with session_scope() as s:
+        assert s.get(Feed, feed_id).next_digest_at_utc == datetime(2024, 1, 3, 18, 0)
+
+
+def test_next_digest_at_uses_local_wall_clock():
+    after = datetime(2024, 3, 30, 22, 0, tzinfo=timezone.utc)
+    assert scheduler_module._next_digest_at("09:00", "Europe/Berlin", after) == datetime(
+        2024, 3, 31, 7, 0, tzinfo=timezone.utc
+    )
+    assert scheduler_module._next_digest_at("9am", "UTC", after) is None
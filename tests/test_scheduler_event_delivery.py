@@ -1,8 +1,10 @@
 import asyncio
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 from aiogram.types import InlineKeyboardMarkup
 from rssbot.db import Delivery, Feed, FeedBaseline, Item, User, init_engine, session_scope
+import rssbot.scheduler as scheduler_module
 from rssbot.scheduler import BotScheduler
 
 
@@ -253,3 +255,31 @@ def test_send_video_message_non_youtube_has_only_open_button():
     assert len(reply_markup.inline_keyboard[1]) == 1
     assert reply_markup.inline_keyboard[1][0].text == "✓"
     assert reply_markup.inline_keyboard[1][0].callback_data == "msg:viewed"
+
+
+def test_maybe_deliver_immediate_records_delivery_once(tmp_path, monkeypatch):
+    init_engine(tmp_path / "bot.sqlite")
+    settings = SimpleNamespace(HIDE_FUTURE_VIDEOS=False)
+    monkeypatch.setattr(scheduler_module, "get_settings", lambda: settings)
+    with session_scope() as s:
+        user = User(chat_id=777, tz="UTC")
+        s.add(user)
+        s.flush()
+        feed = Feed(user_id=user.id, url="https://example.com/rss", mode="immediate")
+        s.add(feed)
+        s.flush()
+        item = Item(feed_id=feed.id, external_id="v1", title="Video", link="https://example.com/v1")
+        s.add(item)
+        s.flush()
+        user_id, item_id = user.id, item.id
+
+    bot = DummyBot()
+    scheduler = BotScheduler(bot=bot)
+    asyncio.run(scheduler._maybe_deliver_immediate(item_id))
+    asyncio.run(scheduler._maybe_deliver_immediate(item_id))
+
+    assert [chat_id for chat_id, _, _ in bot.messages] == [777]
+    with session_scope() as s:
+        deliveries = s.query(Delivery).all()
+        rows = [(d.item_id, d.user_id, d.channel) for d in deliveries]
+        assert rows == [(item_id, user_id, "immediate")]
@@ -1,9 +1,22 @@
 """Tests for YouTube channel_id extraction."""
 import asyncio
 
+import rssbot.bot as bot_module
 from rssbot.bot import _extract_youtube_channel_id
 
 
+def _resolve(url):
+    """Run a live lookup and close the shared session in the same event loop."""
+
+    async def run():
+        try:
+            return await _extract_youtube_channel_id(url)
+        finally:
+            await bot_module.close_http_session()
+
+    return asyncio.run(run())
+
+
 def test_extract_channel_id_direct():
     """Test direct channel_id extraction from URL."""
     test_channel_id = "UC1234567890123456789012"
@@ -32,7 +45,7 @@ def test_extract_channel_id_real_ibm():
     # This test makes a real HTTP request
     # Skip if SSL verification fails (common in test environments)
     try:
-        result = asyncio.run(_extract_youtube_channel_id("https://www.youtube.com/@IBMTechnology"))
+        result = _resolve("https://www.youtube.com/@IBMTechnology")
         # Should return a valid channel ID starting with UC
         if result is None:
             # If it failed, it might be due to SSL or network issues
@@ -65,7 +78,7 @@ def test_extract_channel_id_real_handle():
     # Test with a known channel handle
     try:
         # Try with a popular channel that should exist
-        result = asyncio.run(_extract_youtube_channel_id("https://www.youtube.com/@mkbhd"))
+        result = _resolve("https://www.youtube.com/@mkbhd")
         if result is not None:
             assert result.startswith("UC"), f"Channel ID should start with UC, got: {result}"
             assert len(result) == 24, f"Channel ID should be 24 characters, got {len(result)}: {result}"
@@ -77,3 +90,107 @@ def test_extract_channel_id_real_handle():
             print(f"⚠ Skipping test due to network/SSL issue: {e}")
             return
         raise
+
+
+def test_extract_from_html_bare_fallback_returns_first_uc_id():
+    """Without any channel marker the first bare UC-id on the page is returned."""
+    from utils.yt_channel_id import extract_from_html
+
+    first = "UC" + "a" * 22
+    later = "UC" + "b" * 22
+    html = f'<div data-x="{first}"></div>' + " " * 500 + f'<meta name="channel" value="{later}">'
+    assert extract_from_html(html) == first
+    assert extract_from_html("<p>nothing here</p>") is None
+    assert extract_from_html(f'{{"externalId":"{later}"}} {first}') == later
+
+
+def test_extract_from_html_keeps_marker_priority():
+    """A foreign browseId earlier on the page must not beat the page's own channelId."""
+    from utils.yt_channel_id import extract_from_html
+
+    foreign = "UC" + "g" * 22
+    own = "UC" + "h" * 22
+    html = f'{{"browseId":"{foreign}"}} ... {{"channelId":"{own}"}}'
+    assert extract_from_html(html) == own
+    prop = f'<meta itemprop="channelId" content="{foreign}">'
+    assert extract_from_html(f'{{"channelId":"{own}"}}' + prop) == foreign
+    assert extract_from_html(f'{{"browseId":"{foreign}"}}') == foreign
+
+
+def test_extract_from_json_anchors():
+    """Literal JSON-key fast path should only accept a well-formed UC-id."""
+    from utils.yt_channel_id import extract_from_json_anchors
+
+    own = "UC" + "c" * 22
+    assert extract_from_json_anchors(f'{{"channelId":"{own}"}}'.encode()) == own
+    assert extract_from_json_anchors(f'"channelId":"bad" "externalId":"{own}"'.encode()) == own
+    assert extract_from_json_anchors(b'"channelId":"UCtooshort"') is None
+
+
+def test_channel_head_parser_reads_canonical_link_across_chunks():
+    """Head parser should find the canonical channel link even when split across feeds."""
+    from utils.yt_channel_id import ChannelHeadParser
+
+    own = "UC" + "d" * 22
+    page = f'<html><head><title>x</title><link rel="canonical" href="https://www.youtube.com/channel/{own}"></head>'
+    parser = ChannelHeadParser()
+    parser.feed(page[:50])
+    assert parser.channel_id is None
+    parser.feed(page[50:])
+    assert parser.channel_id == own
+    assert parser.done
+
+    parser = ChannelHeadParser()
+    parser.feed('<html><head><meta property="og:url" content="https://www.youtube.com/@name"></head><body>')
+    assert parser.channel_id is None
+    assert parser.done
+
+
+def test_extract_channel_id_caches_resolved_handles(monkeypatch):
+    """A resolved @handle should be served from the cache on the next lookup."""
+    own = "UC" + "e" * 22
+    calls = []
+
+    async def fake_fetch(page_url):
+        calls.append(page_url)
+        return own
+
+    monkeypatch.setattr(bot_module, "_fetch_and_extract_channel_id", fake_fetch)
+    monkeypatch.setattr(bot_module, "_CHANNEL_ID_CACHE", bot_module.OrderedDict())
+    assert asyncio.run(_extract_youtube_channel_id("youtube.com/@cached")) == own
+    assert asyncio.run(_extract_youtube_channel_id("https://m.youtube.com/@cached?si=x")) == own
+    assert calls == ["https://www.youtube.com/@cached"]
+
+
+def test_fetch_channel_id_ignores_error_pages(monkeypatch):
+    """A 404 page must not yield whatever UC id happens to appear in its body."""
+    other = "UC" + "f" * 22
+    body = f'<link rel="canonical" href="https://www.youtube.com/channel/{other}">'.encode()
+
+    class FakeContent:
+        async def iter_chunked(self, _size):
+            yield body
+
+    class FakeResponse:
+        status = 404
+        url = "https://www.youtube.com/@missing"
+        content = FakeContent()
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class FakeSession:
+        def get(self, _url):
+            return FakeResponse()
+
+    async def fake_session():
+        return FakeSession()
+
+    monkeypatch.setattr(bot_module, "_get_http_session", fake_session)
+    page_url = "https://www.youtube.com/@missing"
+    assert asyncio.run(bot_module._fetch_and_extract_channel_id(page_url)) is None
+    FakeResponse.status = 200
+    assert asyncio.run(bot_module._fetch_and_extract_channel_id(page_url)) == other